@@ -1,7 +1,24 @@
 
-import turtle, math, time, logging
+import os
+import backends
 from Tile import Tile
+from BoardState import BoardState
 import process_puzzle, gameboard
+from PuzzleSpec import PuzzleFormatError, BOARD_PIXELS
+from buttons import ButtonIndex
+from Renderer import Renderer
+from assets import AssetManager
+from Overlay import Overlay
+import instrument
+from catalogue import Catalogue
+from move_log import MoveLog, direction_of, offset, OPPOSITE, replay
+
+# top left corner of the gameboard
+BOARD_X = -365
+BOARD_Y = 290
+# milliseconds between checks on a hint being searched for
+HINT_POLL_MS = 50
+
 
 class Board:
     """
@@ -10,7 +27,8 @@ class Board:
     """
 
     def __init__(self, tr, screen, puzzle_file, moves_allowed,
-                 buttons, name, leaders):
+                 buttons, name, leaders, overlay=None, catalogue=None,
+                 assets=None):
         """
             Method __init__ initializes a new board with tiles.
             Parameters:
@@ -21,27 +39,65 @@ class Board:
                 buttons (list): list of quit, load, reset buttons
                 name (str): user inputted name of player
                 leaders (list): list of past winners for leaderboard
+                overlay (Overlay): shows messages without blocking,
+                                   a new one is made if None
+                catalogue (Catalogue): puzzles offered by the load
+                                       button, puzzle_file's directory
+                                       is scanned if None
+                assets (AssetManager): image cache, possibly preloaded,
+                                       a new one is made if None
         """
         self.add_buttons(buttons) # add in load, reset, quit buttons
         self.tr = tr
         self.screen = screen
+        self.renderer = Renderer(screen) # redraws only changed tiles
+        if assets is None:
+            assets = AssetManager(screen)
+        self.assets = assets # registers each image once
+        if overlay is None:
+            overlay = Overlay(screen)
+        if overlay.assets is None:
+            overlay.assets = self.assets
+        self.overlay = overlay
+        self.game_over = False # ignore clicks once won, lost or quit
+        if catalogue is None:
+            catalogue = Catalogue(os.path.dirname(puzzle_file) or ".")
+        self.catalogue = catalogue
+
+        # error logger, set up before loading can log anything
+        self.logger = gameboard.format_logger('5001_puzzle.err')
 
-        # create shuffled board
-        self.tiles = self.add_puzzle(tr, screen, puzzle_file, False)
-        
-        # sets board position of the tiles
-        self.set_tile_position(self.tiles)
         self.moves = 0
         self.moves_allowed = moves_allowed
         self.name = name
         self.leaders = leaders
 
         # new turtle for tracking player moves and screen messages
-        self.tr2 = turtle.Turtle() # used for Tracking Player moves
+        self.tr2 = backends.make_turtle() # used for Tracking Player moves
         self.tr2.hideturtle()
+        # next best moves, made on the first hint so the solver is
+        # only imported if hints are used
+        self.hints = None
+        self.hint_search = None # (Future, Zobrist hash) of a hint pending
+        self.hint_tr = backends.make_turtle() # outlines the hinted tile
+        self.hint_tr.hideturtle()
+        self.hint_tr.speed(0)
+
+        # no puzzle until one loads; if the first file is rejected the
+        # board waits for the load button
+        self.state = None
+        self.start = None
+        self.history = MoveLog()
+        self.size = 0
+        self.tiles = []
+        self.thumbnail = None
 
-        # error logger
-        self.logger = gameboard.format_logger('5001_puzzle.err')
+        # create shuffled board
+        tiles = self.add_puzzle(tr, screen, puzzle_file, False)
+        if tiles is not None:
+            self.tiles = tiles
+            # sets board position of the tiles
+            self.set_tile_position(self.tiles)
 
 
     ###########################
@@ -52,16 +108,38 @@ class Board:
             Method set_tile_position sets tile row and column
             position on the board.
         """
-        lngth = len(tiles)
-        sqrt = math.sqrt(lngth)
+        cols = self.state.cols
 
         # row of tile = floor division, col = modulus division
-        for i in range(lngth):
-            row = i // sqrt
-            col = i % sqrt
+        for i in range(len(tiles)):
+            row, col = divmod(i, cols)
             tiles[i].set_board_pos(row, col)
 
 
+    def has_puzzle(self):
+        """
+            Method has_puzzle checks if a puzzle is loaded, which is not
+            the case when the first puzzle file was rejected.
+        """
+        return self.state is not None
+
+
+    def get_zobrist(self):
+        """
+            Method get_zobrist returns the Zobrist hash of the tile
+            layout, updated on every move.
+        """
+        return self.state.get_zobrist()
+
+
+    def packed_key(self):
+        """
+            Method packed_key returns the tile layout packed into a 64-bit
+            integer. Raises ValueError for boards over 16 tiles.
+        """
+        return self.state.packed_key()
+
+
     def get_moves(self):
         """
             Method get_moves returns the number of moves taken
@@ -89,13 +167,26 @@ class Board:
             Method check_solved checks if the current puzzle is winning
             by comparing it to the solved puzzle.
         """
-        is_solved = True
-        for i in range(len(self.tiles)):
-            if not self.tiles[i].is_home():
-                is_solved = False # if any tile is wrong, return False
-        return is_solved
+        # board state keeps a running count of misplaced tiles
+        return self.state.is_solved()
 
     
+    def cell_at(self, x, y):
+        """
+            Method cell_at works out which board position was clicked
+            from the board origin and tile size.
+            Parameters:
+                x (float): x coordinate of click
+                y (float): y coordinate of click
+            Returns board position, or None if the click missed the tiles
+        """
+        col = (x - BOARD_X) // self.size
+        row = (BOARD_Y - y) // self.size
+        if 0 <= row < self.state.rows and 0 <= col < self.state.cols:
+            return int(row) * self.state.cols + int(col)
+        return None
+
+
     def check_if_clicked(self, x, y):
         """
             Function check_if_clicked checks which tile was clicked
@@ -106,13 +197,13 @@ class Board:
             Returns tile that was clicked on, and True 
         """
         self.record_click(x, y)
-        # checks each tile to see if it was clicked
-        for tile in self.tiles:
-            if tile.clicked_in_region(x, y):
-                return tile, True
-        return None, False
+        pos = self.cell_at(x, y)
+        if pos is None:
+            return None, False
+        return self.tiles[pos], True
 
 
+    @instrument.timed("board.swap_tiles")
     def swap_tiles(self, x, y):
         """
             Method swap_tiles swaps the clicked on tile with the
@@ -123,17 +214,169 @@ class Board:
             Returns True if tiles were swapped
         """
         # determine which tile was clicked
-        clicked_tile = self.check_if_clicked(x, y)[0]
-        # swap tile if applicable
-        for tile in self.tiles:
-            # swaps if adjacent and blank
-            if tile.is_adjacent(clicked_tile) and tile.is_blank():
-                clicked_tile.swap(tile)
-                # increment moves += 1
-                self.track_player_moves(self.tr2, self.screen)
-                return True
+        pos = self.cell_at(x, y)
+        if pos is None:
+            return False
+        blank = self.state.get_blank()
+        # swap tile if adjacent to the blank, then redraw both tiles
+        if self.state.is_legal(pos):
+            self.history.append(direction_of(blank, pos, self.state.cols))
+            self.slide(pos)
+            # increment moves += 1
+            self.track_player_moves(self.tr2, self.screen)
+            self.renderer.flush()
+            return True
+        return False
+
+
+    def slide(self, pos):
+        """
+            Method slide moves the tile at pos into the blank and marks
+            both tiles to be redrawn on the next flush.
+            Parameters:
+                pos (int): board position of a tile next to the blank
+        """
+        blank = self.state.get_blank()
+        self.state.move(pos)
+        self.renderer.begin()
+        self.clear_hint() # any hint shown is out of date
+        self.tiles[pos].swap(self.tiles[blank], False)
+        self.renderer.mark(pos, self.tiles[pos])
+        self.renderer.mark(blank, self.tiles[blank])
+
+
+    def undo(self):
+        """
+            Method undo takes back the last move.
+            Returns True if there was a move to undo
+        """
+        if self.game_over or not self.has_puzzle():
+            return False
+        direction = self.history.undo()
+        if direction is None:
+            return False
+        # the tile went the other way, so slide it back from there
+        blank = self.state.get_blank()
+        self.slide(blank + offset(OPPOSITE[direction], self.state.cols))
+        self.moves -= 1
+        self.write_moves(self.tr2)
+        self.renderer.flush()
+        return True
+
+
+    def redo(self):
+        """
+            Method redo makes an undone move again.
+            Returns True if there was a move to redo
+        """
+        if self.game_over or not self.has_puzzle():
+            return False
+        direction = self.history.redo()
+        if direction is None:
+            return False
+        blank = self.state.get_blank()
+        self.slide(blank + offset(direction, self.state.cols))
+        self.track_player_moves(self.tr2, self.screen)
+        self.renderer.flush()
+        return True
+
+
+    def get_hints(self):
+        """
+            Method get_hints returns the hint engine, made on first use.
+        """
+        if self.hints is None:
+            from hints import HintEngine
+            self.hints = HintEngine()
+        return self.hints
+
+
+    def hint(self):
+        """
+            Method hint returns the optimal next move, waiting for the
+            search.
+            Returns the board position of the tile to move, or None if
+            the puzzle is solved or no hint was found in time
+        """
+        if not self.has_puzzle():
+            return None
+        return self.get_hints().hint(self.state)
+
+
+    def show_hint(self):
+        """
+            Method show_hint outlines the tile to move next in red until
+            the next move. The search runs in the background and is
+            checked on a screen timer, so the game keeps responding.
+        """
+        if self.game_over or not self.has_puzzle():
+            return
+        key = self.state.get_zobrist()
+        if self.hint_search is not None and self.hint_search[1] == key:
+            return # already looking
+        self.hint_tr.clear()
+        self.hint_search = (self.get_hints().request(self.state), key)
+        self.poll_hint()
+
+
+    def poll_hint(self):
+        """
+            Method poll_hint draws the hint once its search finishes,
+            unless the board has moved on since it was asked for.
+        """
+        if self.hint_search is None:
+            return
+        future, key = self.hint_search
+        if not future.done():
+            self.screen.ontimer(self.poll_hint, HINT_POLL_MS)
+            return
+        self.hint_search = None
+        pos = future.result()
+        if pos is None or self.game_over or key != self.state.get_zobrist():
+            return
+        x, y = self.tiles[pos].get_position()
+        gameboard.draw_rectangle(self.size, self.size, x, y, "red",
+                                 self.hint_tr)
+
+
+    def clear_hint(self):
+        """
+            Method clear_hint erases the hint outline and forgets a hint
+            still being searched for.
+        """
+        self.hint_tr.clear()
+        self.hint_search = None
+
+
+    def close_hints(self):
+        """
+            Method close_hints stops a running hint search, so the game
+            can exit without waiting for it.
+        """
+        self.clear_hint()
+        if self.hints is not None:
+            self.hints.close()
+
+
+    def get_history(self):
+        """
+            Method get_history returns the starting layout and the moves
+            made since, encoded by MoveLog.to_string.
+        """
+        return self.start.copy(), self.history.to_string()
+
+
+    def verify_history(self):
+        """
+            Method verify_history replays the moves made from the
+            starting layout.
+            Returns True if they solve the puzzle within moves_allowed
+        """
+        return replay(self.start, self.history.to_string(),
+                      self.moves_allowed)
     
 
+    @instrument.timed("board.update_board")
     def update_board(self, x, y):
         """
             Method update_board checks if tiles should swap or if
@@ -142,46 +385,48 @@ class Board:
                 x (float): x coordinate of click
                 y (float): y coordinate of click
         """
-        if self.quit.clicked_in_region(x, y): # quit
-            self.quit_button()
-        elif self.load.clicked_in_region(x, y): # load
-            self.load_button()
-        elif self.reset.clicked_in_region(x, y): # reset
-            self.reset_button()
-        elif self.check_if_clicked(x, y)[1]:
+        if self.game_over: # closing message is showing
+            return
+        button_action = self.button_index.find(x, y)
+        if button_action is not None: # quit, load or reset
+            button_action()
+        elif self.has_puzzle() and self.check_if_clicked(x, y)[1]:
             if self.moves >= self.moves_allowed:
-                # save and sort leaderboard without adding new names
-                gameboard.sort_leaderboard(self.leaders)
-                gameboard.save_leaderboard(self.leaders)
-                self.show_message("Resources/lose.gif")
-                self.screen.bye()
+                # no new names, only the game history is updated
+                gameboard.record_loss(self.moves, self.name)
+                self.end_game("Resources/Lose.gif")
+                return
             self.swap_tiles(x, y)
             if self.check_solved():
-                # update leaders, sort, and save
-                self.leaders.append((self.moves, self.name))
+                # update leaders, sort, and append the new one to disk
+                new_leader = (self.moves, self.name)
+                self.leaders.append(new_leader)
                 gameboard.sort_leaderboard(self.leaders)
-                gameboard.save_leaderboard(self.leaders)
-                self.show_message("Resources/winner.gif")
-                self.screen.bye()
+                gameboard.save_leaderboard(self.leaders, new_leader)
+                self.end_game("Resources/winner.gif")
 
 
     def show_message(self, image):
         """
             Method show_message prints chosen message on
-            screen.
+            screen for a few seconds without blocking clicks.
             Parameters:
                 image (str): name of .gif image to show
         """
-        tr = turtle.Turtle()
-        tr.hideturtle()
-        tr.penup()
-        tr.setposition(0,0)
-        self.screen.addshape(image)
-        tr.shape(image)
-        tr.showturtle()
-        time.sleep(5)
-        tr.hideturtle()
-        
+        self.overlay.show(image)
+
+
+    def end_game(self, image):
+        """
+            Method end_game stops accepting moves, shows the final
+            message and closes the screen once it is hidden.
+            Parameters:
+                image (str): name of .gif image to show
+        """
+        self.game_over = True
+        self.close_hints()
+        self.overlay.show(image, then=self.screen.bye)
+
 
     ###########################
     #         Buttons         #
@@ -190,9 +435,22 @@ class Board:
         """
             Method reset resets tile position to winning tiles
         """
-        # resets gameboard to unscrambled tile list
+        if not self.has_puzzle():
+            return
+        # resets gameboard to unscrambled tile list, which starts a
+        # new move history and count, so the count matches the log
+        self.state.reset()
+        self.start = self.state.copy()
+        self.history.clear()
+        self.moves = 0
+        self.write_moves(self.tr2)
+        self.clear_hint()
         for i in range(len(self.tiles)):
-            self.tiles[i].reset()
+            # only tiles out of place need a new stamp
+            if not self.tiles[i].is_home():
+                self.tiles[i].reset(False)
+                self.renderer.mark(i, self.tiles[i])
+        self.renderer.flush()
             
 
 
@@ -201,22 +459,26 @@ class Board:
             Method load_button prompts user for a new puzzle to load
             and loads their selection.
         """
-        puzzle = self.screen.textinput("Load","""Choose the Puzzle to load:
-fifteen.puz
-luigi.puz
-mario.puz
-smiley.puz
-yoshi.puz""")
+        # list the catalogue, scanning only files changed since
+        self.catalogue.scan()
+        puzzle = self.catalogue.resolve(
+            self.screen.textinput("Load", self.catalogue.menu()))
+        if puzzle is None: # dialog cancelled
+            return
         try:
-            # load new tiles
-            self.tiles = self.add_puzzle(self.tr, self.screen, puzzle, True)
-            # Set board positions (row, col) for new shuffled tiles
-            self.set_tile_position(self.tiles)
-            # reset moves to 0
-            self.moves = 0
-            self.tr2.clear()
+            # load new tiles, keeping the current puzzle if it fails
+            tiles = self.add_puzzle(self.tr, self.screen, puzzle, True)
+            if tiles is not None:
+                self.tiles = tiles
+                # Set board positions (row, col) for new shuffled tiles
+                self.set_tile_position(self.tiles)
+                # reset moves to 0
+                self.moves = 0
+                self.tr2.clear()
         except FileNotFoundError:
-            self.logger.error(f"{puzzle} file not found LOCATION: board.load_button()")
+            self.logger.error(f"{puzzle} file not found",
+                              extra={"location": "board.load_button()",
+                                     "puzzle": puzzle, "move": self.moves})
             self.show_message("Resources/file_error.gif")          
 
 
@@ -225,15 +487,18 @@ yoshi.puz""")
             Method quit_button quits the game
             and runs the end credits.
         """
+        self.game_over = True
+        self.close_hints()
+        self.overlay.cancel() # quit right away, even over a message
         self.show_message("Resources/quitmsg.gif")
-        self.show_message("Resources/credits.gif")
-        self.screen.bye()
+        self.end_game("Resources/credits.gif")
 
                 
     ###########################
     #      Board Set up       #
     ###########################
-    def add_puzzle(self, tr, screen, puzzle_file, clear_tiles): 
+    @instrument.timed("board.add_puzzle")
+    def add_puzzle(self, tr, screen, puzzle_file, clear_tiles):
         """
             Function add_puzzle adds the puzzle to the gameboard
             Parameters:
@@ -242,82 +507,95 @@ yoshi.puz""")
                 puzzle_file: .puz file to load
                 clear_tiles: bool to check if old tiles need to be cleared
         """
+        random_tiles = None
         try:
-            # import picture tiles into list - process .puz file and place tiles in a list 
-            puzzle = process_puzzle.process_file(puzzle_file, tr, screen)
-
-            is_viable_number = puzzle["number"] == '4' or puzzle["number"] == '9' or \
-                                  puzzle["number"] == '16'
-
-            # checks if number is 4, 9, or 16
-            if is_viable_number:
-                # creates tiles slightly bigger than actual image
-                self.size = int(puzzle["size"]) + 2 
-                tile_list = puzzle["tiles"]
-
-                try:
-                    # add images to screen
-                    for i in range(len(puzzle["tiles"])):
-                        screen.addshape(puzzle["tiles"][i][1])
-                except Exception:
-                    self.logger.error(".gif file not found LOCATION: \
-board.add_puzzle()")
-
-
-                if clear_tiles: # clear old puzzle, if applicable
-                    self.clear_puzzle()
-
-                
-                # randomize and create tiles - load on screen
-                random_tiles = self.create_tiles(puzzle, True, True)
-            else:
-                self.logger.error("Invalid number in .puz file \
-LOCATION: board.add_puzzle()")
+            # parse and validate the .puz file, cached until it changes,
+            # and start parsing the next puzzle in the background
+            puzzle = self.catalogue.load(puzzle_file)
+
+            try:
+                # add images to screen, skipping ones already added
+                self.assets.register_puzzle(puzzle)
+                self.assets.register(puzzle.thumbnail)
+            except Exception:
+                # the current puzzle stays, nothing has been touched yet
+                self.logger.error(".gif file not found",
+                                  extra={"location": "board.add_puzzle()",
+                                         "puzzle": puzzle_file})
                 self.show_message("Resources/file_error.gif")
-
-            # load thumbnail
-            screen.addshape(puzzle["thumbnail"])
-            self.thumbnail = Tile(puzzle["thumbnail"], 0, 0, 0, 325, 275,
-                                  "none", 0, False, True)
+                return None
+
+            # randomize and create tiles - load on screen
+            state, tiles, size = self.create_tiles(puzzle, True, True)
+            thumbnail = Tile(puzzle.thumbnail, 0, 0, 0, 325, 275,
+                             "none", 0, False, True)
+
+            if clear_tiles: # clear old puzzle, if applicable
+                self.clear_puzzle()
+                # its shapes are no longer drawn, so they can be evicted
+                self.assets.evict()
+
+            # swap the new puzzle in only once it is fully built
+            self.clear_hint() # a hint on the old board means nothing
+            self.state = state
+            # moves are recorded from this layout for undo and replay
+            self.start = state.copy()
+            self.history = MoveLog()
+            self.size = size
+            self.thumbnail = thumbnail
+            random_tiles = tiles
         except FileNotFoundError:
             self.show_message("Resources/file_error.gif")
-            self.logger.error(f"Puzzle {puzzle_file} not found \
-LOCATION: board.add_puzzle()")
-        except KeyError:
-            self.logger.error("dictionary key error, \
-LOCATION: board.add_puzzle()")
-        # return shuffled tiles if dict fully loaded and number is viable
-        if is_viable_number: # and len(puzzle) > 5:
-            return random_tiles
+            self.logger.error(f"Puzzle {puzzle_file} not found",
+                              extra={"location": "board.add_puzzle()",
+                                     "puzzle": puzzle_file})
+        except PuzzleFormatError as error:
+            # bad files are rejected before anything is drawn
+            self.logger.error(f"Invalid .puz file: {error}",
+                              extra={"location": "board.add_puzzle()",
+                                     "puzzle": puzzle_file})
+            self.show_message("Resources/file_error.gif")
+        # return shuffled tiles if the puzzle loaded
+        return random_tiles
 
 
     def create_tiles(self, puzzle, draw, stamp):
         """
             Method create_tiles takes tiles from file and makes tile instances.
+            The board is left unchanged, add_puzzle swaps the result in.
             Parameters:
-                puzzle (dict): dictionary of puzzle info to load
+                puzzle (PuzzleSpec): puzzle to load
                 draw (bool): True if drawing tile on screen
                 stamp (bool): True if stamping tile on screen
-        """
-        tiles_per_line = int(math.sqrt(int(puzzle["number"])))
-        size = int(puzzle["size"]) + 2  # creates tiles slightly bigger than actual image
+            Returns tuple of the shuffled BoardState, the tiles and the
+            tile size in pixels
+        """
+        rows = puzzle.rows
+        cols = puzzle.cols
+        # creates tiles slightly bigger than actual image, shrunk
+        # to fit when there are too many to fit the gameboard
+        size = min(puzzle.size + 2, BOARD_PIXELS // max(rows, cols))
         # top left corner of gameboard
-        x = -365
-        y = 290 
-
-        unshuffled_list = puzzle["tiles"] # create list of tiles to shuffle
-        tile_list = process_puzzle.randomize(unshuffled_list) # randomize tiles
+        x = BOARD_X
+        y = BOARD_Y
+
+        unshuffled_list = puzzle.tile_list() # create list of tiles to shuffle
+        tile_list = process_puzzle.randomize(unshuffled_list, rows=rows,
+                                             cols=cols) # randomize tiles
+        # headless copy of the layout used for moves and win checks
+        state = BoardState.from_tile_numbers(
+            [tile[0] for tile in tile_list], rows, cols)
         tiles = []
         n = 0
         # Add tiles on to screen: i = rows, j = columns
-        for i in range(tiles_per_line):
-            for j in range(tiles_per_line):
-                orig_image = puzzle[str(n + 1)] # set winning tile image
+        for i in range(rows):
+            for j in range(cols):
+                orig_image = puzzle.tiles[n] # set winning tile image
                 tiles.append(Tile(tile_list[n][1], tile_list[n][0], size, size,
                             x + (j * size), y - (i * size), orig_image, (n + 1),
                                   draw, stamp))
                 n += 1 # increment index
-        return tiles
+        return state, tiles, size
 
 
     def add_buttons(self, buttons):
@@ -331,6 +609,12 @@ LOCATION: board.add_puzzle()")
         self.load = buttons[1]
         self.reset = buttons[2]
 
+        # look up clicked buttons by grid cell
+        self.button_index = ButtonIndex()
+        self.button_index.add(self.quit, self.quit_button)
+        self.button_index.add(self.load, self.load_button)
+        self.button_index.add(self.reset, self.reset_button)
+
     
 
     def track_player_moves(self, turtle, screen): 
@@ -342,6 +626,16 @@ LOCATION: board.add_puzzle()")
                 moves (int): Number of moves taken
         """
         self.moves += 1 # increment moves
+        self.write_moves(turtle)
+
+
+    def write_moves(self, turtle):
+        """
+            Method write_moves shows the number of moves on the status
+            line.
+            Parameters:
+                turtle (turtle): turtle to set up status line
+        """
         turtle.clear()
         turtle.penup()
         turtle.width(2)
@@ -357,11 +651,11 @@ LOCATION: board.add_puzzle()")
             Method clear_puzzle clears old puzzle to allow new one
             to be loaded.
         """
-        # clear old tiles and thumbnails and hide turtle (if applicable)
-        for tile in self.tiles:
-            tile.get_tr().clear()
-            tile.get_tr().clearstamps()
-            self.screen.delay(5)
-        self.thumbnail.get_tr().clearstamps()
+        # clear old tiles and thumbnails and hide turtle (if applicable),
+        # their turtles are reused by the next puzzle
+        old = list(self.tiles)
+        if self.thumbnail is not None: # None before the first puzzle
+            old.append(self.thumbnail)
+        self.renderer.clear(old, True)
         self.tr.hideturtle()
 
@@ -0,0 +1,272 @@
+from array import array
+from zobrist import zobrist_table, zobrist_hash, pack, PACKED_MAX_SIZE
+
+# neighbour tables are shared by every state with the same dimensions
+_NEIGHBOURS = {}
+
+
+def neighbour_table(rows, cols):
+    """
+        Function neighbour_table returns, for every cell on a rows x cols
+        board, the tuple of cells that share an edge with it.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+        Returns tuple of tuples indexed by cell
+    """
+    key = (rows, cols)
+    table = _NEIGHBOURS.get(key)
+    if table is None:
+        cells = []
+        for pos in range(rows * cols):
+            row, col = divmod(pos, cols)
+            adjacent = []
+            if row > 0:
+                adjacent.append(pos - cols) # up
+            if row < rows - 1:
+                adjacent.append(pos + cols) # down
+            if col > 0:
+                adjacent.append(pos - 1) # left
+            if col < cols - 1:
+                adjacent.append(pos + 1) # right
+            cells.append(tuple(adjacent))
+        table = tuple(cells)
+        _NEIGHBOURS[key] = table
+    return table
+
+
+class BoardState:
+    """
+        BoardState Class holds the tile layout of a puzzle without any
+        turtle graphics. Cells are stored in a flat byte array where
+        cells[pos] is the 0-based tile that sits at board position pos.
+        The last tile (rows * cols - 1) is the blank and the puzzle is
+        solved when every tile sits at its own index. The Zobrist hash
+        and, for boards of up to 16 cells, the packed 64-bit key are kept
+        up to date on every move.
+    """
+
+    def __init__(self, rows, cols, cells=None):
+        """
+            Method __init__ initializes a new board state.
+            Parameters:
+                rows (int): number of rows on the board
+                cols (int): number of columns on the board
+                cells (iterable): 0-based tile at each position,
+                                  solved layout if None
+        """
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.blank_tile = self.size - 1
+        self.neighbours = neighbour_table(rows, cols)
+
+        if cells is None:
+            cells = range(self.size)
+        self.cells = array('B', cells)
+        if sorted(self.cells) != list(range(self.size)):
+            raise ValueError("cells must be a permutation of "
+                             f"0..{self.size - 1}")
+
+        # cache blank position and count of tiles out of place
+        self.blank = self.cells.index(self.blank_tile)
+        self.misplaced = 0
+        for pos in range(self.size):
+            if self.cells[pos] != pos:
+                self.misplaced += 1
+        self.zobrist_keys = zobrist_table(self.rows, self.cols)
+        self.rehash()
+
+
+    @classmethod
+    def from_tile_numbers(cls, numbers, rows, cols):
+        """
+            Method from_tile_numbers builds a state from the 1-based tile
+            numbers used in .puz files, listed in board order.
+            Parameters:
+                numbers (iterable): 1-based tile numbers
+                rows (int): number of rows on the board
+                cols (int): number of columns on the board
+            Returns new BoardState
+        """
+        return cls(rows, cols, [number - 1 for number in numbers])
+
+
+    ###########################
+    #      Getter Methods     #
+    ###########################
+    def tile_at(self, pos):
+        """
+            Method tile_at returns the 0-based tile at board position pos.
+        """
+        return self.cells[pos]
+
+
+    def get_blank(self):
+        """
+            Method get_blank returns the board position of the blank.
+        """
+        return self.blank
+
+
+    def legal_moves(self):
+        """
+            Method legal_moves returns the board positions of the tiles
+            that can slide into the blank.
+        """
+        return self.neighbours[self.blank]
+
+
+    def key(self):
+        """
+            Method key returns an immutable copy of the layout suitable
+            for use as a dict key.
+        """
+        return self.cells.tobytes()
+
+
+    def get_zobrist(self):
+        """
+            Method get_zobrist returns the 64-bit Zobrist hash of the
+            layout.
+        """
+        return self.zobrist
+
+
+    def packed_key(self):
+        """
+            Method packed_key returns the layout packed into an integer
+            below 2**64, four bits per cell. The shape is not encoded, so
+            only compare keys of boards with the same rows and cols.
+            Raises ValueError for boards with more than 16 cells
+        """
+        if self.packed is None:
+            raise ValueError(f"{self.rows}x{self.cols} board does not pack "
+                             "into 64 bits")
+        return self.packed
+
+
+    def copy(self):
+        """
+            Method copy returns an independent copy of the state.
+        """
+        other = BoardState.__new__(BoardState)
+        other.rows = self.rows
+        other.cols = self.cols
+        other.size = self.size
+        other.blank_tile = self.blank_tile
+        other.neighbours = self.neighbours
+        other.cells = array('B', self.cells)
+        other.blank = self.blank
+        other.misplaced = self.misplaced
+        other.zobrist_keys = self.zobrist_keys
+        other.zobrist = self.zobrist
+        other.packed = self.packed
+        return other
+
+
+    ###########################
+    #     Boolean Methods     #
+    ###########################
+    def is_legal(self, pos):
+        """
+            Method is_legal checks if the tile at pos is next to the blank.
+        """
+        return pos in self.neighbours[self.blank]
+
+
+    def is_solved(self):
+        """
+            Method is_solved checks if every tile is in its home position.
+        """
+        return self.misplaced == 0
+
+
+    ###########################
+    #      Action Methods     #
+    ###########################
+    def apply_move(self, pos):
+        """
+            Method apply_move slides the tile at pos into the blank
+            without checking that the move is legal.
+            Parameters:
+                pos (int): board position of the tile to slide
+            Returns the previous blank position, which undoes the move
+            when passed to undo_move
+        """
+        cells = self.cells
+        blank = self.blank
+        blank_tile = self.blank_tile
+        tile = cells[pos]
+        # only the two touched cells can change the misplaced count
+        self.misplaced += ((tile != blank) - (tile != pos)
+                           + (pos != blank_tile)
+                           - (blank != blank_tile))
+        # or the hash and packed key
+        keys = self.zobrist_keys
+        self.zobrist ^= (keys[blank][tile] ^ keys[pos][tile]
+                         ^ keys[pos][blank_tile] ^ keys[blank][blank_tile])
+        if self.packed is not None:
+            self.packed += (tile - blank_tile) * \
+                           ((1 << (4 * blank)) - (1 << (4 * pos)))
+        cells[blank] = tile
+        cells[pos] = blank_tile
+        self.blank = pos
+        return blank
+
+
+    def undo_move(self, pos):
+        """
+            Method undo_move reverses a move made with apply_move.
+            Parameters:
+                pos (int): blank position returned by apply_move
+        """
+        self.apply_move(pos)
+
+
+    def move(self, pos):
+        """
+            Method move slides the tile at pos into the blank if they
+            are adjacent.
+            Parameters:
+                pos (int): board position of the tile to slide
+            Returns True if the tile was moved
+        """
+        if pos in self.neighbours[self.blank]:
+            self.apply_move(pos)
+            return True
+        return False
+
+
+    def reset(self):
+        """
+            Method reset puts every tile back in its home position.
+        """
+        self.cells = array('B', range(self.size))
+        self.blank = self.blank_tile
+        self.misplaced = 0
+        self.rehash()
+
+
+    def rehash(self):
+        """
+            Method rehash recomputes the Zobrist hash and packed key from
+            the cells.
+        """
+        self.zobrist = zobrist_hash(self.cells, self.rows, self.cols)
+        self.packed = pack(self.cells) if self.size <= PACKED_MAX_SIZE \
+                      else None
+
+
+    def __eq__(self, other):
+        return isinstance(other, BoardState) and \
+               self.rows == other.rows and self.cols == other.cols and \
+               self.cells == other.cells
+
+
+    def __hash__(self):
+        return hash(self.zobrist)
+
+
+    def __repr__(self):
+        return f"BoardState({self.rows}, {self.cols}, {list(self.cells)})"
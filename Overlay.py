@@ -0,0 +1,87 @@
+import backends
+
+
+class Overlay:
+    """
+        Overlay Class shows message images in the middle of the screen
+        without blocking the event loop. Messages are queued and each one
+        is hidden by a screen timer, so clicks and redraws keep working
+        while it is shown.
+    """
+
+    def __init__(self, screen, assets=None):
+        """
+            Method __init__ initializes an empty message queue.
+            Parameters:
+                screen (screen): screen to show messages on
+                assets (AssetManager): registers images once, optional
+        """
+        self.screen = screen
+        self.assets = assets
+        self.queue = [] # (image, duration, callback) waiting to show
+        self.showing = False
+        self.generation = 0 # bumped on cancel so old timers do nothing
+
+        self.tr = backends.make_turtle()
+        self.tr.hideturtle()
+        self.tr.penup()
+        self.tr.setposition(0, 0)
+
+
+    def show(self, image, duration=5000, then=None):
+        """
+            Method show queues a message image.
+            Parameters:
+                image (str): name of .gif image to show
+                duration (int): milliseconds to show it for
+                then (function): called with no arguments once hidden
+        """
+        self.queue.append((image, duration, then))
+        if not self.showing:
+            self.show_next()
+
+
+    def show_next(self):
+        """
+            Method show_next shows the first queued message and sets a
+            timer to hide it.
+        """
+        if not self.queue:
+            self.showing = False
+            return
+        image, duration, then = self.queue.pop(0)
+        if self.assets is not None:
+            self.assets.register(image)
+        else:
+            self.screen.addshape(image)
+        self.showing = True
+        self.tr.shape(image)
+        self.tr.showturtle()
+
+        generation = self.generation
+        def finish():
+            if generation != self.generation: # cancelled
+                return
+            self.tr.hideturtle()
+            if then is not None:
+                then()
+            self.show_next()
+        self.screen.ontimer(finish, duration)
+
+
+    def is_showing(self):
+        """
+            Method is_showing checks if a message is on screen.
+        """
+        return self.showing
+
+
+    def cancel(self):
+        """
+            Method cancel hides the current message and drops the queue
+            without running their callbacks.
+        """
+        self.generation += 1
+        self.queue = []
+        self.showing = False
+        self.tr.hideturtle()
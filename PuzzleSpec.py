@@ -0,0 +1,296 @@
+import struct
+
+# smallest and largest number of rows or columns on a board
+MIN_SIDE = 2
+MAX_SIDE = 10
+# width and height available for tiles inside the gameboard outline
+BOARD_PIXELS = 440
+
+# compiled .puzc layout: header, then length-prefixed UTF-8 strings for
+# the name, thumbnail, source image and each tile image
+MAGIC = b"PUZC"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBH")   # magic, version, rows, cols, size
+LENGTH = struct.Struct("<H")
+
+
+class PuzzleFormatError(ValueError):
+    """
+        PuzzleFormatError Class is raised for a .puz file that cannot be
+        loaded. The message names the file and, where it applies, the
+        line that is wrong.
+    """
+
+    def __init__(self, file_name, message, line=None):
+        """
+            Method __init__ builds the error message.
+            Parameters:
+                file_name (str): puzzle file being loaded
+                message (str): what is wrong
+                line (int): 1-based line number, if known
+        """
+        self.file_name = file_name
+        self.line = line
+        where = file_name if line is None else f"{file_name}:{line}"
+        super().__init__(f"{where}: {message}")
+
+
+def dimensions(number, rows=None, cols=None):
+    """
+        Function dimensions works out the rows and columns of a board.
+        Boards without rows or cols must be square.
+        Parameters:
+            number (int): number of tiles on the board
+            rows (int): number of rows, if given
+            cols (int): number of columns, if given
+        Returns tuple of rows, cols. Raises ValueError if the tile count
+        does not make a board of MIN_SIDE to MAX_SIDE rows and columns
+    """
+    if rows is not None:
+        cols = cols if cols is not None else number // rows
+    elif cols is not None:
+        rows = number // cols
+    else:
+        rows = cols = int(number ** 0.5 + 0.5)
+
+    if rows * cols != number:
+        raise ValueError(f"{number} tiles do not fill a {rows}x{cols} board")
+    if not (MIN_SIDE <= rows <= MAX_SIDE and MIN_SIDE <= cols <= MAX_SIDE):
+        raise ValueError(f"{rows}x{cols} board is outside "
+                         f"{MIN_SIDE}x{MIN_SIDE} to {MAX_SIDE}x{MAX_SIDE}")
+    return rows, cols
+
+
+def check_tile_size(rows, cols, size):
+    """
+        Function check_tile_size checks that tiles of size pixels fit
+        the gameboard side by side.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+            size (int): width and height of a tile image in pixels
+        Raises ValueError if the tiles would overlap
+    """
+    largest = BOARD_PIXELS // max(rows, cols)
+    if size > largest:
+        raise ValueError(f"{size} pixel tiles do not fit a {rows}x{cols} "
+                         f"board, the largest is {largest}")
+
+
+def check_blank(tiles):
+    """
+        Function check_blank checks that the last tile is the blank.
+        Parameters:
+            tiles (sequence): image of each tile in tile order
+        Raises ValueError if the last image is not a blank
+    """
+    if "blank" not in tiles[-1].lower():
+        raise ValueError(f"tile {len(tiles)} must be the blank image")
+
+
+class PuzzleSpec:
+    """
+        PuzzleSpec Class is a validated puzzle definition. Tile images
+        are kept once, in tile order, so tiles[n - 1] is the winning
+        image of tile n and the last tile is the blank.
+    """
+    __slots__ = ("name", "rows", "cols", "size", "thumbnail", "image",
+                 "tiles")
+
+    def __init__(self, name, rows, cols, size, thumbnail, tiles, image=None):
+        """
+            Method __init__ initializes a new puzzle definition.
+            Parameters:
+                name (str): puzzle name
+                rows (int): number of rows on the board
+                cols (int): number of columns on the board
+                size (int): width and height of a tile image in pixels
+                thumbnail (str): thumbnail .gif image
+                tiles (sequence): image of each tile in tile order
+                image (str): source image the tiles are cut from, if any
+        """
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.size = size
+        self.thumbnail = thumbnail
+        self.tiles = tuple(tiles)
+        self.image = image
+
+
+    def get_number(self):
+        """
+            Method get_number returns the number of tiles.
+        """
+        return self.rows * self.cols
+
+
+    def tile_list(self):
+        """
+            Method tile_list returns (tile number, image) tuples in tile
+            order, the layout randomize and create_tiles work on.
+        """
+        return [(n + 1, self.tiles[n]) for n in range(len(self.tiles))]
+
+
+    def to_dict(self):
+        """
+            Method to_dict returns the puzzle in the dict layout of
+            process_puzzle.process_file.
+        """
+        puzzle = {"name": self.name, "number": str(self.get_number()),
+                  "rows": str(self.rows), "cols": str(self.cols),
+                  "size": str(self.size), "thumbnail": self.thumbnail,
+                  "tiles": self.tile_list()}
+        if self.image is not None:
+            puzzle["image"] = self.image
+        for number, image in puzzle["tiles"]:
+            puzzle[str(number)] = image
+        return puzzle
+
+
+    def to_bytes(self):
+        """
+            Method to_bytes encodes the puzzle in the compiled format.
+        """
+        parts = [HEADER.pack(MAGIC, VERSION, self.rows, self.cols,
+                             self.size)]
+        for text in (self.name, self.thumbnail, self.image or "") + \
+                    self.tiles:
+            data = text.encode("utf-8")
+            parts.append(LENGTH.pack(len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+
+    @classmethod
+    def from_bytes(cls, data, file_name="<bytes>"):
+        """
+            Method from_bytes decodes a puzzle written by to_bytes.
+            Parameters:
+                data (bytes): compiled puzzle
+                file_name (str): file name used in errors
+            Returns PuzzleSpec
+        """
+        try:
+            magic, version, rows, cols, size = HEADER.unpack_from(data, 0)
+        except struct.error as error:
+            raise PuzzleFormatError(file_name, f"corrupt file ({error})")
+        if magic != MAGIC or version != VERSION:
+            raise PuzzleFormatError(file_name, "not a compiled puzzle")
+        # the same checks as parse, a .puzc file may be stale or edited
+        try:
+            dimensions(rows * cols, rows, cols)
+            if size == 0:
+                raise ValueError("size must be a positive whole number")
+            check_tile_size(rows, cols, size)
+        except ValueError as error:
+            raise PuzzleFormatError(file_name, str(error))
+        try:
+            offset = HEADER.size
+            texts = []
+            for i in range(3 + rows * cols):
+                length = LENGTH.unpack_from(data, offset)[0]
+                offset += LENGTH.size
+                if offset + length > len(data):
+                    raise PuzzleFormatError(file_name, "corrupt file "
+                                            "(truncated)")
+                texts.append(data[offset:offset + length].decode("utf-8"))
+                offset += length
+        except (struct.error, UnicodeDecodeError) as error:
+            raise PuzzleFormatError(file_name, f"corrupt file ({error})")
+        if offset != len(data):
+            raise PuzzleFormatError(file_name, "corrupt file (trailing data "
+                                    "after the last tile)")
+        name, thumbnail, image = texts[:3]
+        try:
+            check_blank(texts[3:])
+        except ValueError as error:
+            raise PuzzleFormatError(file_name, str(error))
+        return cls(name, rows, cols, size, thumbnail, texts[3:],
+                   image or None)
+
+
+    @classmethod
+    def parse(cls, text, file_name="<text>", slice_names=None):
+        """
+            Method parse reads and validates the text .puz format.
+            Parameters:
+                text (str): contents of a .puz file
+                file_name (str): file name used in errors
+                slice_names (function): names the tiles of a puzzle
+                                        given by one image
+            Returns PuzzleSpec, raises PuzzleFormatError
+        """
+        metadata = {}
+        tiles = {}
+        for line_number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            key, separator, value = line.partition(": ")
+            if not separator:
+                raise PuzzleFormatError(file_name, "expected 'key: value'",
+                                        line_number)
+            key = key.strip().lower()
+            value = value.strip()
+            if key.isdigit():
+                if int(key) in tiles:
+                    raise PuzzleFormatError(file_name,
+                                            f"tile {key} listed twice",
+                                            line_number)
+                tiles[int(key)] = value
+            elif key in ("name", "number", "size", "thumbnail", "rows",
+                         "cols", "image"):
+                metadata[key] = (value, line_number)
+            else:
+                raise PuzzleFormatError(file_name, f"unknown key '{key}'",
+                                        line_number)
+
+        for key in ("name", "number", "size", "thumbnail"):
+            if key not in metadata:
+                raise PuzzleFormatError(file_name, f"missing '{key}'")
+        numbers = {}
+        for key in ("number", "size", "rows", "cols"):
+            if key in metadata:
+                value, line_number = metadata[key]
+                if not value.isdigit() or int(value) == 0:
+                    raise PuzzleFormatError(
+                        file_name, f"{key} must be a positive whole number",
+                        line_number)
+                numbers[key] = int(value)
+
+        number = numbers["number"]
+        try:
+            rows, cols = dimensions(number, numbers.get("rows"),
+                                    numbers.get("cols"))
+        except ValueError as error:
+            raise PuzzleFormatError(file_name, str(error),
+                                    metadata["number"][1])
+        try:
+            check_tile_size(rows, cols, numbers["size"])
+        except ValueError as error:
+            raise PuzzleFormatError(file_name, str(error),
+                                    metadata["size"][1])
+
+        image = metadata["image"][0] if "image" in metadata else None
+        if image is not None and not tiles and slice_names is not None:
+            tiles = dict(slice_names(image, number))
+        missing = [n for n in range(1, number + 1) if n not in tiles]
+        extra = [n for n in tiles if not 1 <= n <= number]
+        if missing or extra:
+            raise PuzzleFormatError(
+                file_name, f"expected tiles 1 to {number}, "
+                f"missing {missing}, unexpected {sorted(extra)}")
+        images = [tiles[n] for n in range(1, number + 1)]
+        try:
+            check_blank(images)
+        except ValueError as error:
+            raise PuzzleFormatError(file_name, str(error))
+
+        return cls(metadata["name"][0], rows, cols, numbers["size"],
+                   metadata["thumbnail"][0], images, image)
+
+
+    def __repr__(self):
+        return (f"PuzzleSpec({self.name!r}, {self.rows}x{self.cols}, "
+                f"size={self.size})")
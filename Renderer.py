@@ -0,0 +1,76 @@
+import instrument
+
+
+class Renderer:
+    """
+        Renderer Class batches tile redraws into frames. Tiles that change
+        are marked dirty, and flush restamps only those tiles with
+        animation turned off, followed by one screen update.
+    """
+
+    def __init__(self, screen):
+        """
+            Method __init__ initializes a renderer for a screen.
+            Parameters:
+                screen (screen): screen the tiles are drawn on
+        """
+        self.screen = screen
+        self.dirty = {} # board position -> tile to redraw
+        self.saved_tracer = None
+
+
+    def begin(self):
+        """
+            Method begin starts a frame. Drawing done before flush is
+            shown in the same screen update.
+        """
+        if self.saved_tracer is None:
+            self.saved_tracer = self.screen.tracer()
+            self.screen.tracer(0)
+
+
+    def mark(self, pos, tile):
+        """
+            Method mark queues a tile to be redrawn.
+            Parameters:
+                pos (int): board position of the tile
+                tile (Tile): tile to redraw
+        """
+        self.dirty[pos] = tile
+
+
+    @instrument.timed("renderer.frame")
+    def flush(self):
+        """
+            Method flush redraws the dirty tiles and updates the screen
+            once, then ends the frame.
+        """
+        self.begin()
+        for tile in self.dirty.values():
+            tile.draw_image()
+        self.dirty.clear()
+        # turning animation back on updates the screen by itself, so
+        # only update here if it stays off
+        self.screen.tracer(self.saved_tracer)
+        if not self.saved_tracer:
+            self.screen.update()
+        self.saved_tracer = None
+
+
+    def clear(self, tiles, release=False):
+        """
+            Method clear removes the stamps and outlines of tiles in a
+            single frame.
+            Parameters:
+                tiles (list): tiles to clear
+                release (bool): True to also return the tiles' turtles
+                                to the pool for the next puzzle
+        """
+        self.begin()
+        self.dirty.clear()
+        for tile in tiles:
+            if release:
+                tile.release()
+            else:
+                tile.clear_image()
+        self.flush()
@@ -1,13 +1,61 @@
 
-import turtle
+import backends
 from gameboard import draw_rectangle
+import instrument
+
+
+class TurtlePool:
+    """
+        TurtlePool Class hands out drawing turtles and takes them back
+        once their tiles are cleared. The screen keeps every turtle ever
+        made, so reusing them keeps the turtle count at the most tiles
+        on screen at once instead of growing with each puzzle load.
+    """
+
+    def __init__(self):
+        """
+            Method __init__ initializes an empty pool.
+        """
+        self.free = []
+
+
+    def acquire(self):
+        """
+            Method acquire returns a hidden turtle with nothing drawn.
+        """
+        if self.free:
+            return self.free.pop()
+        tr = backends.make_turtle()
+        tr.speed(0)
+        tr.hideturtle()
+        return tr
+
+
+    def release(self, tr):
+        """
+            Method release takes back a turtle whose drawings have been
+            cleared.
+            Parameters:
+                tr (turtle): turtle to reuse
+        """
+        self.free.append(tr)
+
+
+# drawing turtles shared by every tile
+pool = TurtlePool()
+
 
 class Tile:
     """
         Tile Class to create individual tiles on the gameboard. Functionality
         includes the ability to swap with another tile and "reset" back to
-        it's original location.
+        it's original location. The turtle that draws a tile comes from a
+        shared pool and goes back to it when the tile is released.
     """
+    __slots__ = ("image", "tile_number", "original_number", "original_image",
+                 "width", "height", "x", "y", "row", "col", "is_blank_tile",
+                 "stamp_id", "tr")
+
     def __init__(self, image, tile_num, width, height,
                  x, y, original_image, original_num, draw, stamp):
         """
@@ -31,11 +79,12 @@ class Tile:
         self.x = x
         self.y = y
         self.is_blank_tile = self.is_blank() # check if blank
+        self.row = None # board position, see set_board_pos
+        self.col = None
+        self.stamp_id = None # current stamp, replaced on each redraw
         
-        # turtle set up
-        self.tr = turtle.Turtle()
-        self.tr.speed(0)
-        self.tr.hideturtle()
+        # turtle set up, reusing one from a released tile if possible
+        self.tr = pool.acquire()
 
         if draw:
             draw_rectangle(self.width, self.height, self.x, self.y, \
@@ -135,9 +184,25 @@ class Tile:
         self.col = col
 
 
-    def set_tile_image(self, image):
+    @instrument.timed("tile.set_tile_image")
+    def set_tile_image(self, image, redraw=True):
         """
             Method set_tile_image sets tile image inside given tile.
+            Parameters:
+                image (str): name of .gif image
+                redraw (bool): True to stamp the image now, False if
+                               a Renderer will draw it
+        """
+        self.image = image
+        self.is_blank_tile = self.is_blank() # update if blank bool
+        if redraw:
+            self.draw_image()
+
+
+    def draw_image(self):
+        """
+            Method draw_image stamps the tile image, replacing the
+            previous stamp so stamps never pile up.
         """
         # move turtle to center of tile
         self.tr.penup()
@@ -146,10 +211,30 @@ class Tile:
         self.tr.pendown()
 
         # stamp image
-        self.image = image
-        self.tr.shape(image)
-        self.tr.stamp()
-        self.is_blank() # update if blank bool
+        if self.stamp_id is not None:
+            self.tr.clearstamp(self.stamp_id)
+        self.tr.shape(self.image)
+        self.stamp_id = self.tr.stamp()
+
+
+    def clear_image(self):
+        """
+            Method clear_image removes the tile outline and stamp.
+        """
+        self.tr.clear()
+        self.tr.clearstamps()
+        self.stamp_id = None
+
+
+    def release(self):
+        """
+            Method release clears the tile and returns its turtle to the
+            pool. The tile is not drawn again after this.
+        """
+        if self.tr is not None:
+            self.clear_image()
+            pool.release(self.tr)
+            self.tr = None
 
 
     def set_tile_number(self, tile_num):
@@ -217,18 +302,19 @@ class Tile:
 
     
     # Action Methods 
-    def swap(self, other):
+    def swap(self, other, redraw=True):
         """
             Method swap swaps places with another tile.
             Parameters:
                 other (tile): tile to swap with
+                redraw (bool): True to stamp both tiles now
         """
         # check if next to each other and are blank:
         if other.is_adjacent(self) and other.is_blank():
             # swap images
             temp = self.get_image()
-            self.set_tile_image(other.get_image())
-            other.set_tile_image(temp)
+            self.set_tile_image(other.get_image(), redraw)
+            other.set_tile_image(temp, redraw)
             # swap tile_num
             self_temp = self.get_tile_number()
             self.set_tile_number(other.get_tile_number())
@@ -240,11 +326,13 @@ class Tile:
             #other.set_board_pos(temp_pos[0], temp_pos[1])
             
 
-    def reset(self):
+    def reset(self, redraw=True):
         """
             Method reset resets tile to original (unshuffled)
             image and tile number.
+            Parameters:
+                redraw (bool): True to stamp the tile now
         """
         self.set_tile_number(self.original_number)
-        self.set_tile_image(self.original_image)
+        self.set_tile_image(self.original_image, redraw)
 
@@ -0,0 +1,174 @@
+from collections import OrderedDict
+import backends
+
+# tile names are "<source image>#<tile number>", the last one is blank
+SLICE_SEPARATOR = "#"
+
+
+def slice_names(source, number):
+    """
+        Function slice_names returns the shape names of the tiles cut
+        from one source image, in tile order.
+        Parameters:
+            source (str): source image file
+            number (int): number of tiles on the board
+        Returns list of tuples of tile number and shape name
+    """
+    tiles = [(n, f"{source}{SLICE_SEPARATOR}{n}") for n in range(1, number)]
+    # Tile.is_blank looks for "blank" in the image name
+    tiles.append((number, f"{source}{SLICE_SEPARATOR}blank"))
+    return tiles
+
+
+def forget_shape(screen, name):
+    """
+        Function forget_shape unregisters a shape so its image can be
+        freed. The turtle screen can add shapes but has no public way to
+        remove one, and every registered image stays alive in its
+        private _shapes dict, so this is the one place that reaches in.
+        Parameters:
+            screen (screen): screen the shape is registered on
+            name (str): shape name
+    """
+    screen._shapes.pop(name, None)
+
+
+def shows_shape(tr):
+    """
+        Function shows_shape checks if a turtle's shape is on screen,
+        either as the turtle itself or as a stamp it has made. Hidden
+        turtles without stamps, such as released pool turtles, keep
+        their last shape but draw nothing with it.
+    """
+    return tr.isvisible() or bool(getattr(tr, "stampItems", None))
+
+
+class AssetManager:
+    """
+        AssetManager Class registers images as turtle shapes at most once.
+        It remembers the shapes it has registered, least recently used
+        first, and forgets the oldest ones that are not in use once
+        there are more than capacity. Puzzles with a single source image
+        are sliced into tiles in memory.
+    """
+
+    def __init__(self, screen, capacity=512):
+        """
+            Method __init__ initializes an empty cache.
+            Parameters:
+                screen (screen): screen the shapes are registered on
+                capacity (int): number of shapes to keep registered
+        """
+        self.screen = screen
+        self.capacity = capacity
+        self.shapes = OrderedDict() # shape name -> sliced Shape or None
+        self.in_use = set()
+        self.pending = [] # images waiting to be registered by preload
+
+
+    def register(self, image):
+        """
+            Method register makes an image file usable as a turtle shape,
+            skipping the disk if it is already registered.
+            Parameters:
+                image (str): .gif file name
+        """
+        if image in self.shapes:
+            self.shapes.move_to_end(image)
+            return
+        self.screen.addshape(image)
+        self.shapes[image] = None
+        self.evict()
+
+
+    def register_sliced(self, source, rows, cols):
+        """
+            Method register_sliced cuts a source image into rows x cols
+            tiles and registers each one, the last as a blank tile.
+            Parameters:
+                source (str): .gif file holding the whole picture
+                rows (int): number of rows on the board
+                cols (int): number of columns on the board
+        """
+        names = [name for n, name in slice_names(source, rows * cols)]
+        if all(name in self.shapes for name in names):
+            for name in names:
+                self.shapes.move_to_end(name)
+            return
+
+        # each shape holds its image, keeping it alive while registered
+        shapes = backends.get_backend().slice_image(source, rows, cols)
+        for name, shape in zip(names, shapes):
+            self.screen.register_shape(name, shape)
+            self.shapes[name] = shape
+            self.shapes.move_to_end(name)
+        self.evict()
+
+
+    def register_puzzle(self, puzzle):
+        """
+            Method register_puzzle registers every tile of a puzzle. The
+            tiles and thumbnail are kept registered until another puzzle
+            is registered.
+            Parameters:
+                puzzle (PuzzleSpec): puzzle to register
+        """
+        self.in_use = set(puzzle.tiles)
+        self.in_use.add(puzzle.thumbnail)
+        if puzzle.image is not None:
+            self.register_sliced(puzzle.image, puzzle.rows, puzzle.cols)
+        else:
+            for image in puzzle.tiles:
+                self.register(image)
+
+
+    def preload(self, images, batch=4):
+        """
+            Method preload registers images a few at a time from screen
+            timers, so decoding them does not hold up the first frame or
+            the event loop.
+            Parameters:
+                images (iterable): .gif file names to register
+                batch (int): images registered per timer tick
+        """
+        start = not self.pending
+        self.pending.extend(images)
+        if start:
+            self.screen.ontimer(lambda: self.preload_step(batch), 0)
+
+
+    def preload_step(self, batch):
+        """
+            Method preload_step registers the next batch of images and
+            sets a timer for the rest.
+        """
+        for image in self.pending[:batch]:
+            try:
+                self.register(image)
+            except Exception:
+                pass # reported when the image is used
+        del self.pending[:batch]
+        if self.pending:
+            self.screen.ontimer(lambda: self.preload_step(batch), 0)
+
+
+    def evict(self):
+        """
+            Method evict forgets the least recently used shapes that are
+            not part of the current puzzle or worn by a turtle, until
+            capacity is met.
+        """
+        if len(self.shapes) <= self.capacity:
+            return
+        # shown turtles are redrawn on update and stamps keep their
+        # image, so those shapes must stay
+        from Tile import pool
+        released = set(map(id, pool.free))
+        worn = set(tr.shape() for tr in self.screen.turtles()
+                   if id(tr) not in released and shows_shape(tr))
+        for name in list(self.shapes):
+            if len(self.shapes) <= self.capacity:
+                break
+            if name not in self.in_use and name not in worn:
+                del self.shapes[name]
+                forget_shape(self.screen, name)
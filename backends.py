@@ -0,0 +1,375 @@
+import os, weakref
+
+# environment variable choosing the backend: "turtle", "null" or "recording"
+BACKEND_VARIABLE = "PUZZLE_BACKEND"
+
+_backend = None
+
+
+class TurtleBackend:
+    """
+        TurtleBackend Class draws with the turtle module on a Tk window.
+        turtle (and with it Tk) is only imported when the first turtle
+        or screen is made.
+    """
+    name = "turtle"
+
+    def make_turtle(self):
+        """
+            Method make_turtle returns a new turtle.
+        """
+        import turtle
+        return turtle.Turtle()
+
+
+    def make_screen(self):
+        """
+            Method make_screen returns the screen.
+        """
+        import turtle
+        return turtle.Screen()
+
+
+    def slice_image(self, source, rows, cols):
+        """
+            Method slice_image cuts a .gif image into rows x cols tile
+            shapes, leaving the last tile empty as the blank.
+            Parameters:
+                source (str): .gif file holding the whole picture
+                rows (int): number of rows on the board
+                cols (int): number of columns on the board
+            Returns list of shapes in tile order
+        """
+        import tkinter, turtle
+        picture = tkinter.PhotoImage(file=source)
+        width = picture.width() // cols
+        height = picture.height() // rows
+        shapes = []
+        for n in range(rows * cols):
+            row, col = divmod(n, cols)
+            tile = tkinter.PhotoImage(width=width, height=height)
+            if n < rows * cols - 1: # blank tile stays empty
+                tile.tk.call(tile, "copy", picture, "-from",
+                             col * width, row * height,
+                             (col + 1) * width, (row + 1) * height)
+            shapes.append(turtle.Shape("image", tile))
+        return shapes
+
+
+class NullTurtle:
+    """
+        NullTurtle Class has the turtle methods the game uses and draws
+        nothing. It keeps its position, shape and stamp ids so the game
+        gets the same answers as from a real turtle.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.x = 0
+        self.y = 0
+        self.visible = True
+        self._shape = "classic"
+        self.stamps = 0
+        self.stampItems = [] # ids of stamps not cleared, as on a turtle
+
+
+    def record(self, method, *args):
+        """
+            Method record is called for every drawing call; NullTurtle
+            ignores them, RecordingBackend turtles keep them.
+        """
+
+
+    def shape(self, name=None):
+        if name is None:
+            return self._shape
+        self._shape = name
+        self.record("shape", name)
+
+
+    def setposition(self, x, y):
+        self.x = x
+        self.y = y
+        self.record("setposition", x, y)
+
+
+    def position(self):
+        return self.x, self.y
+
+
+    def stamp(self):
+        self.stamps += 1
+        self.stampItems.append(self.stamps)
+        self.record("stamp", self._shape, self.x, self.y)
+        return self.stamps
+
+
+    def isvisible(self):
+        return self.visible
+
+
+    def hideturtle(self):
+        self.visible = False
+        self.record("hideturtle")
+
+
+    def showturtle(self):
+        self.visible = True
+        self.record("showturtle")
+
+
+    def clearstamp(self, stamp_id):
+        if stamp_id in self.stampItems:
+            self.stampItems.remove(stamp_id)
+        self.record("clearstamp", stamp_id)
+
+
+    def clearstamps(self):
+        self.stampItems = []
+        self.record("clearstamps")
+
+
+    def clear(self):
+        self.stampItems = []
+        self.record("clear")
+
+
+    def write(self, text, *args, **kwargs):
+        self.record("write", text)
+
+
+    def forward(self, distance):
+        self.record("forward", distance)
+
+
+    def right(self, angle):
+        self.record("right", angle)
+
+
+    def seth(self, angle):
+        self.record("seth", angle)
+
+
+    def color(self, *args):
+        self.record("color", *args)
+
+
+    def speed(self, speed=None):
+        pass
+
+
+    def width(self, width=None):
+        pass
+
+
+    def penup(self):
+        pass
+
+
+    def pendown(self):
+        pass
+
+
+    def onclick(self, function, btn=1, add=None):
+        pass
+
+
+class NullScreen:
+    """
+        NullScreen Class stands in for the turtle screen. Dialogs return
+        answers queued in answers (None once they run out, like a
+        cancelled dialog), and timers wait until run_timers is called.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._shapes = {}
+        self.answers = []
+        self.timers = []
+        self.tracer_value = 1
+        self.updates = 0 # screen updates, one per frame
+        self.closed = False
+
+
+    def addshape(self, name, shape=None):
+        self._shapes[name] = shape
+
+    register_shape = addshape
+
+
+    def turtles(self):
+        return list(self.backend.turtles)
+
+
+    def tracer(self, n=None, delay=None):
+        if n is None:
+            return self.tracer_value
+        self.tracer_value = n
+        if n:
+            self.update() # as turtle does
+
+
+    def update(self):
+        self.updates += 1
+
+
+    def textinput(self, title, prompt):
+        return self.answers.pop(0) if self.answers else None
+
+
+    def numinput(self, title, prompt, default=None, minval=None,
+                 maxval=None):
+        return self.answers.pop(0) if self.answers else default
+
+
+    def ontimer(self, function, t=0):
+        self.timers.append(function)
+
+
+    def run_timers(self):
+        """
+            Method run_timers runs the timers set so far, in order, as if
+            their time had passed.
+        """
+        timers, self.timers = self.timers, []
+        for function in timers:
+            function()
+
+
+    def bye(self):
+        self.closed = True
+
+
+    def setup(self, width=None, height=None, startx=None, starty=None):
+        pass
+
+
+    def onclick(self, function, btn=1, add=None):
+        pass
+
+
+    def onkey(self, function, key):
+        pass
+
+
+    def listen(self, xdummy=None, ydummy=None):
+        pass
+
+
+    def mainloop(self):
+        pass
+
+
+class NullBackend:
+    """
+        NullBackend Class runs the game without a display: turtles and
+        the screen do nothing, and neither turtle nor Tk is imported.
+    """
+    name = "null"
+    turtle_class = NullTurtle
+
+    def __init__(self):
+        self.turtles = weakref.WeakSet() # live turtles, for turtles()
+        self.screen = None
+
+
+    def make_turtle(self):
+        """
+            Method make_turtle returns a new headless turtle.
+        """
+        tr = self.turtle_class(self)
+        self.turtles.add(tr)
+        return tr
+
+
+    def make_screen(self):
+        """
+            Method make_screen returns the backend's only screen.
+        """
+        if self.screen is None:
+            self.screen = NullScreen(self)
+        return self.screen
+
+
+    def slice_image(self, source, rows, cols):
+        """
+            Method slice_image returns a placeholder shape per tile.
+        """
+        return [None] * (rows * cols)
+
+
+class RecordingTurtle(NullTurtle):
+    """
+        RecordingTurtle Class is a NullTurtle that logs its drawing calls
+        to the backend.
+    """
+
+    def record(self, method, *args):
+        self.backend.calls.append((id(self), method) + args)
+
+
+class RecordingBackend(NullBackend):
+    """
+        RecordingBackend Class is a NullBackend that keeps every drawing
+        call as a (turtle id, method, *args) tuple in calls, so tests
+        can check what would have been drawn.
+    """
+    name = "recording"
+    turtle_class = RecordingTurtle
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+
+    def stamps(self):
+        """
+            Method stamps returns the (shape, x, y) of every stamp made.
+        """
+        return [call[2:] for call in self.calls if call[1] == "stamp"]
+
+
+BACKENDS = {"turtle": TurtleBackend, "null": NullBackend,
+            "recording": RecordingBackend}
+
+
+def get_backend():
+    """
+        Function get_backend returns the backend in use, chosen by the
+        PUZZLE_BACKEND environment variable on first use.
+    """
+    global _backend
+    if _backend is None:
+        name = os.environ.get(BACKEND_VARIABLE, "turtle")
+        if name not in BACKENDS:
+            raise ValueError(f"unknown {BACKEND_VARIABLE} '{name}', "
+                             f"expected one of {', '.join(BACKENDS)}")
+        _backend = BACKENDS[name]()
+    return _backend
+
+
+def set_backend(backend):
+    """
+        Function set_backend makes every turtle and screen made from now
+        on come from backend.
+        Parameters:
+            backend: TurtleBackend, NullBackend or RecordingBackend
+        Returns backend
+    """
+    global _backend
+    _backend = backend
+    return backend
+
+
+def make_turtle():
+    """
+        Function make_turtle returns a new turtle from the backend.
+    """
+    return get_backend().make_turtle()
+
+
+def make_screen():
+    """
+        Function make_screen returns the screen of the backend.
+    """
+    return get_backend().make_screen()
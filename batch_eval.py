@@ -0,0 +1,213 @@
+try:
+    import numpy as np
+except ImportError: # only needed for batch analytics
+    np = None
+
+# boards scored at a time, small enough that temporaries stay in cache
+CHUNK = 1 << 16
+
+# goal tables by board dimensions
+_TABLES = {}
+
+
+def require_numpy():
+    """
+        Function require_numpy raises ImportError if NumPy is missing.
+    """
+    if np is None:
+        raise ImportError("batch_eval needs NumPy: pip install numpy")
+
+
+class GoalTables:
+    """
+        GoalTables Class holds the lookup tables for scoring boards of
+        one size: the Manhattan distance of every tile from every cell,
+        flattened so a batch is scored with one gather.
+    """
+
+    def __init__(self, rows, cols):
+        """
+            Method __init__ builds the tables for a board size.
+            Parameters:
+                rows (int): number of rows on the board
+                cols (int): number of columns on the board
+        """
+        require_numpy()
+        self.rows = rows
+        self.cols = cols
+        self.size = size = rows * cols
+        self.blank_tile = size - 1
+
+        pos = np.arange(size)
+        goal_row, goal_col = np.divmod(pos, cols)
+        # distance[pos, tile] = moves for tile to get home from pos
+        distance = (np.abs(goal_row[:, None] - goal_row[None, :]) +
+                    np.abs(goal_col[:, None] - goal_col[None, :]))
+        distance[:, self.blank_tile] = 0 # the blank does not count
+        self.distance = distance.astype(np.uint8).ravel()
+        # added to each tile to index distance by (pos, tile)
+        self.offsets = (pos * size).astype(np.uint16)
+        self.goal = pos.astype(np.uint8)
+        # distance of the blank from its home, for solvability
+        self.blank_distance = (np.abs(goal_row - goal_row[-1]) +
+                               np.abs(goal_col - goal_col[-1])) \
+                              .astype(np.uint8)
+
+
+def goal_tables(rows, cols):
+    """
+        Function goal_tables returns the shared tables for a board size.
+    """
+    key = (rows, cols)
+    tables = _TABLES.get(key)
+    if tables is None:
+        tables = _TABLES[key] = GoalTables(rows, cols)
+    return tables
+
+
+def as_boards(boards, rows, cols):
+    """
+        Function as_boards checks a batch and returns it as a uint8
+        array of shape (N, rows * cols).
+        Parameters:
+            boards (array-like): 0-based tile in each cell of each board
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+    """
+    require_numpy()
+    boards = np.asarray(boards, dtype=np.uint8)
+    if boards.ndim != 2 or boards.shape[1] != rows * cols:
+        raise ValueError(f"expected shape (N, {rows * cols}), "
+                         f"got {boards.shape}")
+    return boards
+
+
+def from_states(states):
+    """
+        Function from_states stacks BoardState layouts into a batch.
+        Parameters:
+            states (list): BoardStates of the same size
+        Returns uint8 array of shape (N, rows * cols)
+    """
+    require_numpy()
+    if not states:
+        return np.zeros((0, 0), dtype=np.uint8)
+    data = b"".join(state.key() for state in states)
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(states), -1)
+
+
+def manhattan(boards, rows, cols):
+    """
+        Function manhattan returns the Manhattan distance of each board.
+        Returns uint16 array of shape (N,)
+    """
+    boards = as_boards(boards, rows, cols)
+    tables = goal_tables(rows, cols)
+    result = np.empty(len(boards), dtype=np.uint16)
+    for start in range(0, len(boards), CHUNK):
+        chunk = boards[start:start + CHUNK]
+        index = chunk + tables.offsets # uint16, one index per cell
+        result[start:start + CHUNK] = tables.distance.take(index).sum(
+            axis=1, dtype=np.uint16)
+    return result
+
+
+def misplaced(boards, rows, cols):
+    """
+        Function misplaced returns the number of tiles out of place on
+        each board, not counting the blank.
+        Returns uint8 array of shape (N,)
+    """
+    boards = as_boards(boards, rows, cols)
+    tables = goal_tables(rows, cols)
+    out = (boards != tables.goal)
+    # a blank out of place is not a misplaced tile
+    out &= (boards != tables.blank_tile)
+    return out.sum(axis=1, dtype=np.uint8)
+
+
+def solved(boards, rows, cols):
+    """
+        Function solved checks each board for the winning layout.
+        Returns bool array of shape (N,)
+    """
+    boards = as_boards(boards, rows, cols)
+    return (boards == goal_tables(rows, cols).goal).all(axis=1)
+
+
+def parity(boards, rows, cols):
+    """
+        Function parity returns the parity of the permutation of each
+        board, counting the blank as a tile: 0 even, 1 odd.
+        Returns uint8 array of shape (N,)
+    """
+    boards = as_boards(boards, rows, cols)
+    size = rows * cols
+    if size > 63 or not hasattr(np, "bitwise_count"):
+        return pair_parity(boards)
+    dtype = np.uint32 if size < 32 else np.uint64
+    result = np.empty(len(boards), dtype=np.uint8)
+    for start in range(0, len(boards), CHUNK):
+        # one row per cell, so each step reads contiguous memory
+        tiles = np.ascontiguousarray(boards[start:start + CHUNK].T,
+                                     dtype=dtype)
+        seen = np.zeros(tiles.shape[1], dtype=dtype)
+        # wraps past 255, which keeps the parity
+        inversions = np.zeros(tiles.shape[1], dtype=np.uint8)
+        for tile in tiles:
+            # bits of the larger tiles already seen are inversions
+            inversions += np.bitwise_count(seen >> (tile + 1)) \
+                          .astype(np.uint8)
+            seen |= dtype(1) << tile
+        result[start:start + CHUNK] = inversions & 1
+    return result
+
+
+def pair_parity(boards):
+    """
+        Function pair_parity returns the permutation parity of each board
+        by comparing every pair of cells, for boards too large to keep
+        the tiles seen in one integer.
+    """
+    result = np.zeros(len(boards), dtype=bool)
+    # every inversion flips the parity
+    for i in range(boards.shape[1] - 1):
+        column = boards[:, i:i + 1]
+        result ^= np.logical_xor.reduce(column > boards[:, i + 1:], axis=1)
+    return result.view(np.uint8)
+
+
+def solvable(boards, rows, cols, parities=None):
+    """
+        Function solvable checks each board can be solved: each move
+        changes both the permutation parity and the parity of the
+        blank's distance from home, so they must match.
+        Parameters:
+            parities (array): result of parity for boards, if known
+        Returns bool array of shape (N,)
+    """
+    boards = as_boards(boards, rows, cols)
+    tables = goal_tables(rows, cols)
+    if parities is None:
+        parities = parity(boards, rows, cols)
+    blank = np.argmax(boards == tables.blank_tile, axis=1)
+    return parities == (tables.blank_distance[blank] & 1)
+
+
+def evaluate(boards, rows, cols):
+    """
+        Function evaluate scores a batch of boards.
+        Parameters:
+            boards (array-like): (N, rows * cols) 0-based tiles
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+        Returns dict of arrays: manhattan, misplaced, parity, solvable
+        and solved
+    """
+    boards = as_boards(boards, rows, cols)
+    parities = parity(boards, rows, cols)
+    return {"manhattan": manhattan(boards, rows, cols),
+            "misplaced": misplaced(boards, rows, cols),
+            "parity": parities,
+            "solvable": solvable(boards, rows, cols, parities),
+            "solved": solved(boards, rows, cols)}
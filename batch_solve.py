@@ -0,0 +1,239 @@
+import argparse, concurrent.futures, json, math, os, sys, time
+import process_puzzle, solver
+from BoardState import BoardState
+
+# heuristics built once per worker process, keyed by (rows, cols)
+_heuristics = {}
+_database = None
+
+
+def is_number(value):
+    """
+        Function is_number checks if a JSON value is a whole number.
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_numbers(values, name):
+    """
+        Function check_numbers raises ValueError unless values is a list
+        of whole numbers.
+    """
+    if not isinstance(values, list) or not all(map(is_number, values)):
+        raise ValueError(f"{name} must be a list of whole numbers")
+
+
+def parse_line(line, line_number):
+    """
+        Function parse_line turns one input line into a job. A line is
+        either a JSON object with "cells" (0-based) or "tiles" (1-based)
+        plus "rows"/"cols" or a "puzzle" file, or a list of 1-based tile
+        numbers in board order, optionally after a .puz file name:
+            mario.puz: 5 12 11 14 13 4 7 1 2 16 15 6 3 9 10 8
+        Parameters:
+            line (str): input line
+            line_number (int): line number, used as the default job id
+        Returns job dict with id, rows, cols and cells. Raises
+        ValueError if the tiles do not fill the board exactly once
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        job = json.loads(line)
+    elif ":" in line:
+        puzzle_file, tiles = line.split(":", 1)
+        job = {"puzzle": puzzle_file.strip(), "tiles": tiles}
+    else:
+        job = {"tiles": line}
+
+    if isinstance(job.get("tiles"), str):
+        job["tiles"] = [int(tile) for tile in
+                        job["tiles"].replace(",", " ").split()]
+    if "cells" not in job:
+        check_numbers(job["tiles"], "tiles")
+        job["cells"] = [tile - 1 for tile in job["tiles"]]
+    check_numbers(job["cells"], "cells")
+
+    # board size comes from the job, its .puz file, or a square board
+    if "rows" not in job:
+        if "puzzle" in job:
+            puzzle = process_puzzle.load_puzzle(job["puzzle"])
+            job["rows"], job["cols"] = puzzle.rows, puzzle.cols
+        else:
+            job["rows"] = job["cols"] = math.isqrt(len(job["cells"]))
+    job.setdefault("cols", len(job["cells"]) // job["rows"]
+                           if is_number(job["rows"]) and job["rows"] else 0)
+    if not (is_number(job["rows"]) and is_number(job["cols"])):
+        raise ValueError("rows and cols must be whole numbers")
+    size = job["rows"] * job["cols"]
+    if size != len(job["cells"]):
+        raise ValueError(f"{len(job['cells'])} tiles do not fill a "
+                         f"{job['rows']}x{job['cols']} board")
+    if sorted(job["cells"]) != list(range(size)):
+        raise ValueError(f"tiles must be a permutation of 1..{size}")
+    job.setdefault("id", line_number)
+    return job
+
+
+def read_jobs(infile):
+    """
+        Function read_jobs parses every non-empty line of infile. Lines
+        that cannot be parsed become jobs that report their error.
+        Parameters:
+            infile (file): open input file
+        Yields job dicts
+    """
+    for line_number, line in enumerate(infile, 1):
+        if not line.strip():
+            continue
+        try:
+            job = parse_line(line, line_number)
+        except Exception as error: # a bad line must not end the batch
+            job = {"id": line_number, "error": str(error)}
+        yield job
+
+
+def init_worker(database):
+    """
+        Function init_worker maps the pattern database once per worker.
+        Parameters:
+            database (str): pattern database file, or None
+    """
+    global _database
+    if database is not None:
+        import pattern_db
+        _database = pattern_db.PatternDatabase(database)
+
+
+def get_heuristic(rows, cols):
+    """
+        Function get_heuristic returns the best heuristic this worker has
+        for the board size.
+    """
+    if _database is not None and \
+       (_database.rows, _database.cols) == (rows, cols):
+        return _database
+    key = (rows, cols)
+    if key not in _heuristics:
+        _heuristics[key] = solver.LinearConflict(rows, cols)
+    return _heuristics[key]
+
+
+def solve_job(job, time_limit):
+    """
+        Function solve_job solves one job inside a worker process.
+        Parameters:
+            job (dict): job from parse_line
+            time_limit (float): seconds allowed, no limit if None
+        Returns result dict
+    """
+    result = {"id": job["id"]}
+    if "error" in job: # line could not be parsed
+        result.update(status="error", error=job["error"])
+        return result
+    try:
+        state = BoardState(job["rows"], job["cols"], job["cells"])
+        solution = solver.solve(state, get_heuristic(state.rows, state.cols),
+                                time_limit)
+        result.update(status="solved", length=len(solution),
+                      moves=solution.moves, tiles=solution.tiles,
+                      nodes=solution.nodes,
+                      elapsed=round(solution.elapsed, 6))
+    except TimeoutError:
+        result.update(status="timeout")
+    except Exception as error: # reported, the other jobs carry on
+        result.update(status="error", error=str(error))
+    return result
+
+
+def solve_batch(jobs, workers=None, time_limit=None, database=None):
+    """
+        Function solve_batch solves jobs across a process pool and yields
+        each result as soon as it finishes, so results may come out of
+        order. Only a few jobs per worker are queued at a time, which
+        keeps memory flat on long input streams.
+        Parameters:
+            jobs (iterable): job dicts from parse_line
+            workers (int): worker processes, one per CPU if None
+            time_limit (float): seconds allowed per job, no limit if None
+            database (str): pattern database file, or None
+        Yields result dicts
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    pending = set()
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=init_worker,
+            initargs=(database,)) as executor:
+        while True:
+            # top the queue back up before waiting on the next result
+            for job in jobs:
+                pending.add(executor.submit(solve_job, job, time_limit))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                return
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def main(argv=None):
+    """
+        Function main runs the batch solver from the command line and
+        writes one JSON result per line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Solve a stream of boards in parallel.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file with one board per line, - for stdin")
+    parser.add_argument("-o", "--output", default="-",
+                        help="JSONL results file, - for stdout")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes, default one per CPU")
+    parser.add_argument("-t", "--timeout", type=float, default=None,
+                        help="seconds allowed per board")
+    parser.add_argument("-d", "--database", default=None,
+                        help="pattern database built by pattern_db.py")
+    parser.add_argument("--progress", type=float, default=5.0,
+                        help="seconds between progress reports on stderr")
+    args = parser.parse_args(argv)
+
+    infile = sys.stdin if args.input == "-" else open(args.input, "r")
+    outfile = sys.stdout if args.output == "-" else open(args.output, "w")
+    jobs = read_jobs(infile)
+
+    start = time.perf_counter()
+    last_report = start
+    counts = {"solved": 0, "timeout": 0, "error": 0}
+    nodes = 0
+    try:
+        for result in solve_batch(jobs, args.workers, args.timeout,
+                                  args.database):
+            outfile.write(json.dumps(result) + "\n")
+            outfile.flush()
+            counts[result["status"]] += 1
+            nodes += result.get("nodes", 0)
+            now = time.perf_counter()
+            if now - last_report >= args.progress:
+                last_report = now
+                print(f"{sum(counts.values())} boards, "
+                      f"{sum(counts.values()) / (now - start):.1f}/s",
+                      file=sys.stderr)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(json.dumps({"boards": total, **counts, "nodes": nodes,
+                      "elapsed": round(elapsed, 3),
+                      "boards_per_second": round(total / elapsed, 2),
+                      "nodes_per_second": round(nodes / elapsed)}),
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,212 @@
+import argparse, json, os, platform, statistics, sys, tempfile, time
+
+# puzzles are found beside this file, whatever the working directory
+HERE = os.path.dirname(os.path.abspath(__file__))
+# slower than the baseline by more than this fraction is a regression
+THRESHOLD = 0.10
+
+
+###########################
+#        Benchmarks       #
+###########################
+def time_case(function, number, repeat):
+    """
+        Function time_case times function number times in a row, repeat
+        times over.
+        Returns dict of the median and best seconds per call
+    """
+    runs = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        for j in range(number):
+            function()
+        runs.append((time.perf_counter() - start) / number)
+    return {"median_us": statistics.median(runs) * 1e6,
+            "best_us": min(runs) * 1e6, "number": number, "repeat": repeat}
+
+
+def make_board(puzzle="mario.puz"):
+    """
+        Function make_board builds a game board on the headless screen.
+    """
+    import backends, Board
+    from Tile import Tile
+    buttons = [Tile("Resources/quitbutton.gif", 0, 80, 50, 260, -225,
+                    "none", 0, False, True),
+               Tile("Resources/loadbutton.gif", 0, 80, 80, 155, -210,
+                    "none", 0, False, True),
+               Tile("Resources/resetbutton.gif", 0, 80, 80, 55, -210,
+                    "none", 0, False, True)]
+    return Board.Board(backends.make_turtle(), backends.make_screen(),
+                       os.path.join(HERE, puzzle), 10 ** 9, buttons,
+                       "bench", [])
+
+
+def cell_centre(board, pos):
+    """
+        Function cell_centre returns screen coordinates inside a cell.
+    """
+    from Board import BOARD_X, BOARD_Y
+    row, col = divmod(pos, board.state.cols)
+    return (BOARD_X + col * board.size + board.size / 2,
+            BOARD_Y - row * board.size - board.size / 2)
+
+
+def cases():
+    """
+        Function cases returns the benchmarks by name, each a function
+        that sets up and returns the callable to time.
+    """
+    import process_puzzle, gameboard
+
+    def process_file_cold():
+        file_name = os.path.join(HERE, "mario.puz")
+        def run():
+            process_puzzle._specs.clear()
+            process_puzzle.process_file(file_name, None, None)
+        return run
+
+    def process_file_cached():
+        file_name = os.path.join(HERE, "mario.puz")
+        return lambda: process_puzzle.process_file(file_name, None, None)
+
+    def randomize():
+        tiles = process_puzzle.load_puzzle(
+            os.path.join(HERE, "mario.puz")).tile_list()
+        return lambda: process_puzzle.randomize(tiles, rows=4, cols=4)
+
+    def check_if_clicked():
+        board = make_board()
+        x, y = cell_centre(board, 5)
+        return lambda: board.check_if_clicked(x, y)
+
+    def swap_tiles():
+        board = make_board()
+        state = board.state
+        def run():
+            # slide a tile next to the blank, always a legal move
+            board.swap_tiles(*cell_centre(board, state.legal_moves()[0]))
+        return run
+
+    def check_solved():
+        board = make_board()
+        return board.check_solved
+
+    def leaderboard_round_trip():
+        leaders = [(moves, f"player{moves}") for moves in range(1000, 0, -1)]
+        def run():
+            entries = list(leaders)
+            gameboard.sort_leaderboard(entries)
+            gameboard.save_leaderboard(entries, (500, "bench"))
+            gameboard.open_leaderboard(None, None)
+        return run
+
+    def load_puzzle():
+        board = make_board()
+        names = [os.path.join(HERE, name) for name in
+                 ("fifteen.puz", "luigi.puz", "mario.puz", "smiley.puz",
+                  "yoshi.puz")]
+        turn = [0]
+        def run():
+            board.screen.answers.append(names[turn[0] % len(names)])
+            turn[0] += 1
+            board.load_button()
+        return run
+
+    return {"process_file_cold": (process_file_cold, 200),
+            "process_file_cached": (process_file_cached, 5000),
+            "randomize": (randomize, 2000),
+            "check_if_clicked": (check_if_clicked, 20000),
+            "swap_tiles": (swap_tiles, 5000),
+            "check_solved": (check_solved, 50000),
+            "leaderboard_round_trip": (leaderboard_round_trip, 50),
+            "load_puzzle": (load_puzzle, 200)}
+
+
+def run_benchmarks(names=None, repeat=5, scale=1.0):
+    """
+        Function run_benchmarks runs the benchmarks in a scratch
+        directory, so leaderboard and log files are not touched.
+        Parameters:
+            names (list): benchmarks to run, all if None
+            repeat (int): timed runs of each benchmark
+            scale (float): multiplies the calls per run
+        Returns dict of results by benchmark name
+    """
+    results = {}
+    cwd = os.getcwd()
+    sys.path.insert(0, HERE)
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for name, (setup, number) in cases().items():
+                if names and name not in names:
+                    continue
+                results[name] = time_case(setup(), max(1, int(number * scale)),
+                                          repeat)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+        Function compare checks results against a baseline run.
+        Parameters:
+            results (dict): results of run_benchmarks
+            baseline (dict): results saved from an earlier run
+            threshold (float): allowed slowdown, 0.10 for 10%
+        Returns dict of benchmark name to (ratio, regressed)
+    """
+    report = {}
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result["median_us"] / baseline[name]["median_us"]
+            report[name] = (ratio, ratio > 1 + threshold)
+    return report
+
+
+def main():
+    """
+        Main function runs the benchmarks and writes the JSON report.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the game's hot paths without a display.")
+    parser.add_argument("names", nargs="*", help="benchmarks to run")
+    parser.add_argument("-o", "--output", help="write the JSON report here")
+    parser.add_argument("-b", "--baseline", help="JSON report to compare to")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-s", "--scale", type=float, default=1.0,
+                        help="multiply the calls per run")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown before failing (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    import backends
+    backends.set_backend(backends.NullBackend())
+    results = run_benchmarks(args.names, args.repeat, args.scale)
+    report = {"python": platform.python_version(),
+              "platform": platform.platform(),
+              "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as outfile:
+            outfile.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r") as infile:
+            baseline = json.load(infile)["results"]
+        failed = False
+        for name, (ratio, regressed) in compare(
+                results, baseline, args.threshold).items():
+            failed = failed or regressed
+            print(f"{name:24} {ratio:6.2f}x baseline"
+                  f"{'  REGRESSION' if regressed else ''}", file=sys.stderr)
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
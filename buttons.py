@@ -1,7 +1,7 @@
 
-import turtle
+import backends
 from Tile import Tile
-from process_puzzle import process_file
+from catalogue import Catalogue
 
 
 def add_button(image, fun, x, y, screen):
@@ -17,7 +17,7 @@ def add_button(image, fun, x, y, screen):
     """
     # set turtle to an image, move to it's spot, and add the function
     # to pass in to perform onclick
-    tr = turtle.Turtle()
+    tr = backends.make_turtle()
     tr.speed(0)
     tr.penup()
     tr.setposition(x, y)
@@ -32,23 +32,21 @@ def add_button(image, fun, x, y, screen):
     return tr
 
 
-def load_puzzle(screen):
+def load_puzzle(screen, catalogue=None):
     """
         Function load_puzzle loads puzzle user chooses from list.
         Parameters:
             screen: Turtle Screen
-        Return puzzle to be opened
+            catalogue (Catalogue): puzzles to choose from, the current
+                                   directory is scanned if None
+        Return puzzle to be opened, or None if the dialog was cancelled
     """
-    
-    puzzles = ["fifteen.puz", "luigi.puz", "mario.puz", "smiley.puz", "yoshi.puz"]
-    puzzle = screen.textinput("""Choose the Puzzle to load:
-fifteen.puz
-luigi.puz
-mario.puz
-smiley.puz
-yoshi.puz""")
-    
-    return process_file(puzzle)
+    if catalogue is None:
+        catalogue = Catalogue()
+    puzzle = catalogue.resolve(screen.textinput("Load", catalogue.menu()))
+    if puzzle is None:
+        return None
+    return catalogue.load(puzzle)
 
 
 def reset(puzzle):
@@ -60,3 +58,56 @@ def quit(screen):
     """
     pass #screen.done()
     
+
+
+class ButtonIndex:
+    """
+        ButtonIndex Class finds the button under a click by bucketing
+        buttons into a coarse grid, so a click only tests the buttons
+        that overlap its grid cell.
+    """
+
+    def __init__(self, cell=100):
+        """
+            Method __init__ initializes an empty index.
+            Parameters:
+                cell (int): width and height of a grid cell in pixels
+        """
+        self.cell = cell
+        self.buckets = {}
+
+
+    def add(self, button, action):
+        """
+            Method add registers a button and the function to run
+            when it is clicked.
+            Parameters:
+                button (Tile): button tile with position and size
+                action (function): called with no arguments on click
+        """
+        x, y = button.get_position()
+        # buttons are placed by their top left corner
+        first_col = int(x // self.cell)
+        last_col = int((x + button.get_width()) // self.cell)
+        first_row = int((y - button.get_height()) // self.cell)
+        last_row = int(y // self.cell)
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                self.buckets.setdefault((col, row), []).append(
+                    (button, action))
+
+
+    def find(self, x, y):
+        """
+            Method find returns the action of the button clicked.
+            Parameters:
+                x (float): x coordinate of click
+                y (float): y coordinate of click
+            Returns the action, or None if no button was clicked
+        """
+        bucket = self.buckets.get((int(x // self.cell), int(y // self.cell)))
+        if bucket:
+            for button, action in bucket:
+                if button.clicked_in_region(x, y):
+                    return action
+        return None
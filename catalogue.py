@@ -0,0 +1,311 @@
+import json, os
+import process_puzzle
+from PuzzleSpec import dimensions
+
+PUZZLE_EXTENSION = ".puz"
+# index of the scanned headers, kept beside the puzzles
+INDEX_FILE = "catalogue.json"
+# puzzles listed in the load dialog
+MENU_SIZE = 20
+HEADER_KEYS = ("name", "number", "size", "thumbnail", "rows", "cols")
+
+
+class CatalogueEntry:
+    """
+        CatalogueEntry Class holds what the load dialog needs to know
+        about a puzzle without loading its tiles.
+    """
+    __slots__ = ("file_name", "name", "rows", "cols", "size", "thumbnail",
+                 "version")
+
+    def __init__(self, file_name, name, rows, cols, size, thumbnail,
+                 version):
+        """
+            Method __init__ initializes a new entry.
+            Parameters:
+                file_name (str): .puz file
+                name (str): puzzle name
+                rows (int): number of rows on the board
+                cols (int): number of columns on the board
+                size (int): width and height of a tile image in pixels
+                thumbnail (str): thumbnail .gif image
+                version (tuple): file (mtime, size) when it was read
+        """
+        self.file_name = file_name
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.size = size
+        self.thumbnail = thumbnail
+        self.version = version
+
+
+    def get_number(self):
+        """
+            Method get_number returns the number of tiles.
+        """
+        return self.rows * self.cols
+
+
+    def to_list(self):
+        """
+            Method to_list returns the entry as it is stored in the index.
+        """
+        return [list(self.version), self.name, self.rows, self.cols,
+                self.size, self.thumbnail]
+
+
+    def __repr__(self):
+        return (f"CatalogueEntry({self.file_name!r}, {self.rows}x{self.cols}"
+                f", size={self.size})")
+
+
+def file_version(file_name):
+    """
+        Function file_version returns the (mtime, size) of a file, which
+        changes whenever the file is rewritten.
+    """
+    stat = os.stat(file_name)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_header(file_name):
+    """
+        Function read_header reads the name, size and thumbnail of a .puz
+        file, stopping at the first tile line once they are all found.
+        Parameters:
+            file_name (str): .puz file
+        Returns CatalogueEntry. Raises ValueError if the header is
+        incomplete or the tile count does not make a board
+    """
+    header = {}
+    with open(file_name, "r") as infile:
+        for line in infile:
+            key, separator, value = line.partition(": ")
+            key = key.strip().lower()
+            if key in HEADER_KEYS:
+                header[key] = value.strip()
+            elif key.isdigit() and all(k in header for k in HEADER_KEYS[:4]):
+                break # the rest of the file is tiles
+    for key in HEADER_KEYS[:4]:
+        if key not in header:
+            raise ValueError(f"{file_name}: missing '{key}'")
+    rows, cols = dimensions(int(header["number"]),
+                            int(header["rows"]) if "rows" in header else None,
+                            int(header["cols"]) if "cols" in header else None)
+    return CatalogueEntry(file_name, header["name"], rows, cols,
+                          int(header["size"]), header["thumbnail"],
+                          file_version(file_name))
+
+
+class Catalogue:
+    """
+        Catalogue Class indexes the puzzles in a directory. Scanning only
+        reads the header of each .puz file, and the headers are saved in
+        an index file so later scans only read the files that changed.
+        Full puzzles are loaded when they are chosen, and the puzzle
+        after the one chosen is parsed on a background thread so it is
+        ready if the player moves on to it.
+    """
+
+    def __init__(self, directory=".", index_file=INDEX_FILE):
+        """
+            Method __init__ scans the directory for puzzles.
+            Parameters:
+                directory (str): directory holding the .puz files
+                index_file (str): index file name inside the directory,
+                                  nothing is saved if None
+        """
+        self.directory = directory
+        self.index_file = index_file
+        self.entries = {} # file name -> CatalogueEntry, in name order
+        self.errors = {} # file name -> reason it was left out
+        self.prefetcher = None
+        self.prefetched = {} # file name -> Future of its PuzzleSpec
+        self.scan()
+
+
+    def index_path(self):
+        """
+            Method index_path returns the index file, or None.
+        """
+        if self.index_file is None:
+            return None
+        return os.path.join(self.directory, self.index_file)
+
+
+    def read_index(self):
+        """
+            Method read_index returns the saved index, or an empty one if
+            it is missing or unreadable.
+        """
+        index_path = self.index_path()
+        if index_path is None or not os.path.exists(index_path):
+            return {}
+        try:
+            with open(index_path, "r") as infile:
+                return json.load(infile)
+        except (OSError, ValueError):
+            return {}
+
+
+    def save_index(self):
+        """
+            Method save_index writes the index beside the old one and
+            swaps it in, so a crash never leaves half an index.
+        """
+        index_path = self.index_path()
+        if index_path is None:
+            return
+        index = {os.path.basename(file_name): entry.to_list()
+                 for file_name, entry in self.entries.items()}
+        try:
+            with open(index_path + ".tmp", "w") as outfile:
+                json.dump(index, outfile)
+            os.replace(index_path + ".tmp", index_path)
+        except OSError:
+            pass # a read-only directory is scanned again next time
+
+
+    def scan(self):
+        """
+            Method scan brings the catalogue up to date with the
+            directory, reading only the headers of new or changed files.
+        """
+        index = self.read_index()
+        entries = {}
+        errors = {}
+        changed = False
+        with os.scandir(self.directory) as found:
+            names = sorted(item.name for item in found
+                           if item.name.endswith(PUZZLE_EXTENSION))
+        for base_name in names:
+            file_name = os.path.join(self.directory, base_name) \
+                        if self.directory != "." else base_name
+            version = file_version(file_name)
+            saved = index.get(base_name)
+            if saved is not None and tuple(saved[0]) == version:
+                entries[file_name] = CatalogueEntry(file_name, *saved[1:],
+                                                    version)
+                continue
+            try:
+                entries[file_name] = read_header(file_name)
+                changed = True
+            except (OSError, ValueError) as error:
+                errors[file_name] = str(error)
+        self.entries = entries
+        self.errors = errors
+        if changed or len(index) != len(entries):
+            self.save_index()
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+
+    def names(self):
+        """
+            Method names returns the puzzle files in catalogue order.
+        """
+        return list(self.entries)
+
+
+    def menu(self, limit=MENU_SIZE):
+        """
+            Method menu returns the text of the load dialog.
+            Parameters:
+                limit (int): number of puzzles to list
+        """
+        lines = ["Choose the Puzzle to load (number or file):"]
+        for n, entry in enumerate(self.entries.values(), 1):
+            if n > limit:
+                lines.append(f"... and {len(self.entries) - limit} more")
+                break
+            lines.append(f"{n}. {os.path.basename(entry.file_name)} "
+                         f"({entry.rows}x{entry.cols})")
+        return "\n".join(lines)
+
+
+    def resolve(self, choice):
+        """
+            Method resolve turns a load dialog answer into a file name.
+            Parameters:
+                choice (str): menu number, file name or puzzle name
+            Returns file name, or choice itself if nothing matched so
+            the loader can report the missing file
+        """
+        if choice is None:
+            return None
+        choice = choice.strip()
+        names = self.names()
+        if choice.isdigit() and 1 <= int(choice) <= len(names):
+            return names[int(choice) - 1]
+        for file_name, entry in self.entries.items():
+            if choice in (file_name, os.path.basename(file_name),
+                          entry.name):
+                return file_name
+        return choice
+
+
+    def next_after(self, file_name):
+        """
+            Method next_after returns the puzzle after file_name in
+            catalogue order, or None.
+        """
+        names = self.names()
+        if file_name not in self.entries or len(names) < 2:
+            return None
+        return names[(names.index(file_name) + 1) % len(names)]
+
+
+    def prefetch(self, file_name):
+        """
+            Method prefetch parses a puzzle on a background thread.
+            Parameters:
+                file_name (str): puzzle to parse
+        """
+        if file_name is None or file_name in self.prefetched:
+            return
+        if self.prefetcher is None:
+            # imported on first use, it is slow to import at startup
+            from concurrent.futures import ThreadPoolExecutor
+            self.prefetcher = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="catalogue")
+        self.prefetched[file_name] = self.prefetcher.submit(
+            process_puzzle.load_puzzle, file_name)
+
+
+    def load(self, file_name):
+        """
+            Method load returns the full puzzle, waiting for a
+            background parse of it if one is running, and starts
+            parsing the next puzzle.
+            Parameters:
+                file_name (str): puzzle to load
+            Returns PuzzleSpec. Raises FileNotFoundError for a missing
+            file and PuzzleFormatError for a malformed one
+        """
+        future = self.prefetched.pop(file_name, None)
+        if future is not None:
+            try:
+                future.result()
+            except Exception:
+                pass # loaded again below, raising in this thread
+        # cached by process_puzzle once parsed, checked against the file
+        puzzle = process_puzzle.load_puzzle(file_name)
+        self.prefetch(self.next_after(file_name))
+        return puzzle
+
+
+    def close(self):
+        """
+            Method close stops the background thread.
+        """
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown(wait=False, cancel_futures=True)
+            self.prefetcher = None
+        self.prefetched = {}
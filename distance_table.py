@@ -0,0 +1,211 @@
+import os, random, sys
+from array import array
+from BoardState import BoardState, neighbour_table
+from pattern_db import rank, unrank, pattern_size
+
+# boards up to this many cells get a full table, 9! entries for 3x3
+MAX_CELLS = 9
+# table value of layouts that cannot be reached from the goal
+UNREACHABLE = 255
+# tables are saved beside this module and loaded on later runs
+HERE = os.path.dirname(os.path.abspath(__file__))
+FILE_PATTERN = "distances_{rows}x{cols}.bin"
+
+# tables by board dimensions
+_tables = {}
+
+
+def table_file(rows, cols):
+    """
+        Function table_file returns where the table of a board size is
+        saved.
+    """
+    return os.path.join(HERE, FILE_PATTERN.format(rows=rows, cols=cols))
+
+
+def build_distances(rows, cols):
+    """
+        Function build_distances runs one breadth-first search from the
+        solved board and returns the optimal solution length of every
+        layout, indexed by permutation rank.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+        Returns bytearray of rows * cols factorial entries,
+        UNREACHABLE for layouts of the wrong parity
+    """
+    size = rows * cols
+    neighbours = neighbour_table(rows, cols)
+    distances = bytearray([UNREACHABLE]) * pattern_size(size, size)
+    goal = bytes(range(size))
+    distances[rank(goal, size)] = 0
+    frontier = [(goal, size - 1)] # layout and blank position
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for cells, blank in frontier:
+            for pos in neighbours[blank]:
+                child = bytearray(cells)
+                child[blank] = child[pos]
+                child[pos] = size - 1
+                index = rank(child, size)
+                if distances[index] == UNREACHABLE:
+                    distances[index] = depth
+                    next_frontier.append((bytes(child), pos))
+        frontier = next_frontier
+    return distances
+
+
+class DistanceTable:
+    """
+        DistanceTable Class holds the optimal solution length of every
+        layout of a small board, one byte per permutation rank. Optimal
+        lengths, optimal next moves and boards of a given difficulty
+        are then lookups instead of searches.
+    """
+
+    def __init__(self, rows, cols, distances=None):
+        """
+            Method __init__ initializes the table of a board size.
+            Parameters:
+                rows (int): number of rows on the board
+                cols (int): number of columns on the board
+                distances (bytes): table from build_distances, built if
+                                   None
+        """
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        if self.size > MAX_CELLS:
+            raise ValueError(f"{rows}x{cols} board is too large for a "
+                             f"full table, at most {MAX_CELLS} cells")
+        if distances is None:
+            distances = build_distances(rows, cols)
+        if len(distances) != pattern_size(self.size, self.size):
+            raise ValueError("distance table does not match the board size")
+        self.distances = distances
+        self.by_depth = {} # depth -> ranks at that depth, made on demand
+
+
+    def distance(self, cells):
+        """
+            Method distance returns the optimal solution length of a
+            layout, or None if it cannot be solved.
+            Parameters:
+                cells (sequence): 0-based tile in each cell
+        """
+        value = self.distances[rank(cells, self.size)]
+        return None if value == UNREACHABLE else value
+
+
+    def best_moves(self, state):
+        """
+            Method best_moves returns every move on an optimal solution.
+            Parameters:
+                state (BoardState): board to move on
+            Returns list of board positions of the tiles to slide
+        """
+        depth = self.distance(state.cells)
+        if not depth:
+            return []
+        moves = []
+        for pos in state.legal_moves():
+            blank = state.apply_move(pos)
+            if self.distance(state.cells) == depth - 1:
+                moves.append(pos)
+            state.undo_move(blank)
+        return moves
+
+
+    def next_move(self, state):
+        """
+            Method next_move returns an optimal next move, or None if the
+            board is solved or cannot be solved.
+        """
+        moves = self.best_moves(state)
+        return moves[0] if moves else None
+
+
+    def max_depth(self):
+        """
+            Method max_depth returns the longest optimal solution.
+        """
+        return max(d for d in self.distances if d != UNREACHABLE)
+
+
+    def random_state(self, depth, rng=None):
+        """
+            Method random_state returns a random board whose optimal
+            solution is exactly depth moves long.
+            Parameters:
+                depth (int): wanted optimal solution length
+                rng (Random): random number generator
+            Raises ValueError if no board is that far from solved
+        """
+        ranks = self.by_depth.get(depth)
+        if ranks is None:
+            ranks = array('I', (index for index, value in
+                                enumerate(self.distances) if value == depth))
+            self.by_depth[depth] = ranks
+        if not ranks:
+            raise ValueError(f"no {self.rows}x{self.cols} board is {depth} "
+                             "moves from solved")
+        index = (rng or random).choice(ranks)
+        return BoardState(self.rows, self.cols,
+                          unrank(index, self.size, self.size))
+
+
+    def save(self, file_name):
+        """
+            Method save writes the table to a file.
+        """
+        with open(file_name, "wb") as outfile:
+            outfile.write(self.distances)
+
+
+def has_table(rows, cols):
+    """
+        Function has_table checks if a board size is small enough for a
+        full table.
+    """
+    return rows * cols <= MAX_CELLS
+
+
+def get_table(rows, cols):
+    """
+        Function get_table returns the distance table of a board size.
+        It is read from its file if saved before, otherwise built and
+        saved for next time.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+    """
+    key = (rows, cols)
+    table = _tables.get(key)
+    if table is not None:
+        return table
+    file_name = table_file(rows, cols)
+    distances = None
+    if os.path.exists(file_name):
+        with open(file_name, "rb") as infile:
+            distances = infile.read()
+        if len(distances) != pattern_size(rows * cols, rows * cols):
+            distances = None # stale or damaged, build it again
+    table = DistanceTable(rows, cols, distances)
+    if distances is None:
+        try:
+            table.save(file_name)
+        except OSError:
+            pass # built again next run
+    _tables[key] = table
+    return table
+
+
+if __name__ == "__main__":
+    # build the tables, e.g. python distance_table.py 3x3 2x2
+    for size in sys.argv[1:] or ["2x2", "3x3"]:
+        rows, cols = (int(side) for side in size.split("x"))
+        table = get_table(rows, cols)
+        print(f"{table_file(rows, cols)}: longest solution "
+              f"{table.max_depth()} moves")
@@ -1,20 +1,23 @@
 
-import turtle, time, logging
+import os
+from collections import Counter
+import leaderboard, puzzle_log, instrument
+
+# open leaderboard stores, keyed by file name
+_stores = {}
+# SQLite leaderboard database, text files are used if None
+LEADERBOARD_DB = None
 
 
 def format_logger(FileName):
     """
-        Function format_logger creates the logger with specified
-        FileName.
+        Function format_logger returns the logger writing to the
+        specified FileName. The file handler is only added on the
+        first call for each file, see puzzle_log.get_logger.
         Parameters:
             FileName (str): file name to save to
     """
-    logger = logging.getLogger('logger')
-    handler = logging.FileHandler(FileName)
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    return logger
+    return puzzle_log.get_logger(FileName)
 
 
 def draw_rectangle(width, height, x, y, color, tr):
@@ -75,88 +78,133 @@ def make_leaderboard(turtle, screen, leaders):
     turtle.setposition(0, 0)
 
 
-def open_leaderboard(tr, screen):
+def get_leaderboard_store(puzzle=None):
+    """
+        Function get_leaderboard_store returns the store for a puzzle's
+        leaderboard, or the shared one if puzzle is None.
+        Parameters:
+            puzzle (str): puzzle name or .puz file
+    """
+    if LEADERBOARD_DB is not None:
+        key = (LEADERBOARD_DB, puzzle)
+        if key not in _stores:
+            _stores[key] = leaderboard.SqliteLeaderboard(LEADERBOARD_DB,
+                                                         puzzle)
+        return _stores[key]
+    file_name = leaderboard.store_name(puzzle)
+    if file_name not in _stores:
+        _stores[file_name] = leaderboard.LeaderboardStore(file_name)
+    return _stores[file_name]
+
+
+def use_sqlite_leaderboard(db_file="leaders.db", migrate_from="leaders.txt"):
+    """
+        Function use_sqlite_leaderboard switches open_leaderboard and
+        save_leaderboard to an SQLite database. A database that has not
+        been migrated yet is filled from the text leaderboard first.
+        Parameters:
+            db_file (str): SQLite database file
+            migrate_from (str): text leaderboard to copy, or None
+    """
+    global LEADERBOARD_DB
+    LEADERBOARD_DB = db_file
+    store = get_leaderboard_store()
+    if migrate_from is not None and os.path.exists(migrate_from):
+        store.migrate(migrate_from) # once per database
+
+
+@instrument.timed("leaderboard.open")
+def open_leaderboard(tr, screen, overlay=None, puzzle=None):
     """
         Function open_leaderboard opens leaderboard file and returns
-        the list of leaders.
+        the top ten leaders, without reading the rest of the file.
         Parameters:
             tr (turtle): turtle to print leaderboard error
             screen (screen): screen to show error on
+            overlay (Overlay): shows the error without blocking, the
+                               error is drawn with tr if None
+            puzzle (str): puzzle whose leaderboard to open, shared
+                          leaderboard if None
     """
     leaders = []
-    try:
-        with open("leaders.txt", "r") as infile:
-            for line in infile:
-                line.strip('\n') # removes \n character
-                line = line.split(':')
-                if len(line) > 1:
-                    leaders.append((int(line[0]), line[1]))
-        sort_leaderboard(leaders)
-    except FileNotFoundError:
+    store = get_leaderboard_store(puzzle)
+    if store.exists():
+        leaders = store.top(leaderboard.TOP_SIZE)
+    else:
         # error logger
         logger = format_logger('5001_puzzle.err')
-        logger.error("leaders.txt file not found LOCATION: \
-gameboard.open_leaderboard()")
-        # re-center turtle
-        tr.penup()
-        tr.setposition(0, 0)
-        screen.addshape("Resources/leaderboard_error.gif")
-        tr.shape("Resources/leaderboard_error.gif")
-        tr.showturtle()
-        time.sleep(3)
+        logger.error(f"{leaderboard.store_name(puzzle)} file not found",
+                     extra={"location": "gameboard.open_leaderboard()",
+                            "puzzle": puzzle})
+        if overlay is not None:
+            overlay.show("Resources/leaderboard_error.gif", 3000)
+        else:
+            # re-center turtle
+            tr.penup()
+            tr.setposition(0, 0)
+            screen.addshape("Resources/leaderboard_error.gif")
+            tr.shape("Resources/leaderboard_error.gif")
+            tr.showturtle()
     return leaders
 
 
 def sort_leaderboard(lst):
     """
         Function sort_leaderboard sorts leaderboard in
-        ascending using the merge sort method.
+        ascending order of moves, in place. Ties keep their order.
         Parameters:
             leaders (list): list of leaders (unsorted)
     """
-    if len(lst) <= 1:
-        pass
-    if len(lst) > 1:
-        mid = len(lst) // 2
-        left_half = lst[:mid]
-        right_half = lst[mid:]
-
-        sort_leaderboard(left_half) # recursively call ourself with each half
-        sort_leaderboard(right_half)
-
-        i = 0 # index for left half
-        j = 0 # index for right half
-        k = 0 # index for original list
-
-        while i < len(left_half) and j < len(right_half): # merge sublist
-            if left_half[i][0] <= right_half[j][0]:
-                lst[k] = left_half[i]
-                i = i + 1
-            else:
-                lst[k] = right_half[j]
-                j = j + 1
-            k = k + 1
-
-        # left list
-        while i < len(left_half):
-            lst[k] = left_half[i]
-            i = i + 1
-            k = k + 1
-
-        # right list
-        while j < len(right_half):
-            lst[k] = right_half[j]
-            j = j + 1
-            k = k + 1
-    
-
-def save_leaderboard(leaders):
+    lst.sort(key=leaderboard.moves_of)
+
+
+@instrument.timed("leaderboard.save")
+def save_leaderboard(leaders, new_leader=None, puzzle=None):
     """
         Function save_leaderboard saves leaders list to
-        leaders.txt.
-        leaders (list): list of leaders
+        leaders.txt. When new_leader is given only that entry is
+        appended, otherwise the entries of leaders that are not stored
+        yet are added. leaders may be just the top ten from
+        open_leaderboard, so nothing already stored is removed.
+        Parameters:
+            leaders (list): sorted list of leaders
+            new_leader (tuple): (moves, name) just added to leaders
+            puzzle (str): puzzle whose leaderboard to save, shared
+                          leaderboard if None
+    """
+    store = get_leaderboard_store(puzzle)
+    if new_leader is not None:
+        store.add(new_leader[0], new_leader[1])
+        return
+    stored = Counter((moves, name.strip()) for moves, name in store.entries())
+    for moves, name in leaders:
+        entry = (int(moves), name.strip())
+        if stored[entry]:
+            stored[entry] -= 1 # already saved
+        else:
+            store.add(*entry)
+
+
+def rewrite_leaderboard(leaders, puzzle=None):
+    """
+        Function rewrite_leaderboard replaces every stored score with
+        leaders. Scores not in leaders are deleted.
+        Parameters:
+            leaders (list): sorted list of every leader to keep
+            puzzle (str): puzzle whose leaderboard to rewrite, shared
+                          leaderboard if None
+    """
+    get_leaderboard_store(puzzle).replace(leaders)
+
+
+@instrument.timed("leaderboard.record_loss")
+def record_loss(moves, name, puzzle=None):
+    """
+        Function record_loss adds a lost game to the game history, if
+        the leaderboard keeps one.
+        Parameters:
+            moves (int): number of moves taken
+            name (str): name of the player
+            puzzle (str): puzzle that was played, shared if None
     """
-    with open("leaders.txt", "w") as outfile:
-        for leader in leaders:
-            outfile.write(str(leader[0]) + ":" +
-                          leader[1].strip() + '\n')
+    get_leaderboard_store(puzzle).record_game(moves, name, False)
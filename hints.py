@@ -0,0 +1,219 @@
+import os, threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import solver, distance_table
+
+# solved positions remembered by a hint engine
+HINT_CACHE_SIZE = 4096
+# seconds a hint may search before giving up, searches run in the
+# background so the game keeps responding meanwhile
+HINT_TIME_LIMIT = 10.0
+# pattern databases built by pattern_db.py are found beside this module
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATABASE_PATTERN = "patterns_{rows}x{cols}.pdb"
+# cached in place of a move for positions whose search ran out of time
+NO_HINT = -1
+
+
+def database_file(rows, cols):
+    """
+        Function database_file returns where the pattern database of a
+        board size is looked for.
+    """
+    return os.path.join(HERE, DATABASE_PATTERN.format(rows=rows, cols=cols))
+
+
+def get_heuristic(rows, cols):
+    """
+        Function get_heuristic returns the pattern database of a board
+        size if one has been built, otherwise None so the solver uses
+        Manhattan distance plus linear conflicts.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+    """
+    file_name = database_file(rows, cols)
+    if not os.path.exists(file_name):
+        return None
+    import pattern_db
+    try:
+        database = pattern_db.PatternDatabase(file_name)
+    except (OSError, ValueError):
+        return None # unreadable, search without it
+    if (database.rows, database.cols) != (rows, cols):
+        database.close()
+        return None
+    return database
+
+
+class HintEngine:
+    """
+        HintEngine Class finds the optimal next move of a board. Each
+        search solves the board, and the next move of every position on
+        the solution path is kept in an LRU cache keyed by the Zobrist
+        hash of the position. A player who follows the hints stays on
+        that path, so later hints are cache lookups. Boards small enough
+        for a full distance table are answered from the table instead.
+        Searches run on one background thread, so request can be polled
+        from the UI thread without freezing the game.
+    """
+
+    def __init__(self, capacity=HINT_CACHE_SIZE, heuristic=None,
+                 time_limit=HINT_TIME_LIMIT):
+        """
+            Method __init__ initializes an empty hint cache.
+            Parameters:
+                capacity (int): positions to remember
+                heuristic: solver heuristic, see solver.solve; the pattern
+                           database of the board size is used if None
+                time_limit (float): seconds a search may take, no limit
+                                    if None
+        """
+        self.capacity = capacity
+        self.heuristic = heuristic
+        self.heuristics = {} # (rows, cols) -> heuristic found for the size
+        self.time_limit = time_limit
+        self.cache = OrderedDict() # Zobrist hash -> board position
+        self.lock = threading.Lock() # the cache is filled by the worker
+        self.stop = threading.Event()
+        self.executor = None
+        self.pending = {} # Zobrist hash -> Future of a running search
+        self.hits = 0
+        self.misses = 0
+
+
+    def remember(self, key, pos):
+        """
+            Method remember caches the next move of a position, dropping
+            the least recently used positions past capacity.
+        """
+        with self.lock:
+            self.cache[key] = pos
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+
+
+    def cached(self, key):
+        """
+            Method cached returns the cached move of a position, NO_HINT
+            if its search ran out of time, or None if it is not cached.
+        """
+        with self.lock:
+            pos = self.cache.get(key)
+            if pos is not None:
+                self.cache.move_to_end(key)
+            return pos
+
+
+    def heuristic_for(self, rows, cols):
+        """
+            Method heuristic_for returns the heuristic for a board size.
+        """
+        if self.heuristic is not None:
+            return self.heuristic
+        key = (rows, cols)
+        if key not in self.heuristics:
+            self.heuristics[key] = get_heuristic(rows, cols)
+        return self.heuristics[key]
+
+
+    def search(self, state):
+        """
+            Method search finds the next move of a board not in the
+            cache. It runs on the background thread.
+            Parameters:
+                state (BoardState): copy of the board, not moved meanwhile
+            Returns board position of the tile to move, or None
+        """
+        if distance_table.has_table(state.rows, state.cols):
+            return distance_table.get_table(state.rows, state.cols) \
+                                 .next_move(state)
+        key = state.get_zobrist()
+        try:
+            solution = solver.solve(
+                state, self.heuristic_for(state.rows, state.cols),
+                self.time_limit, self.stop)
+        except TimeoutError:
+            if not self.stop.is_set():
+                self.remember(key, NO_HINT) # do not search it again
+            return None
+        # remember the whole path, the player is likely to follow it
+        work = state.copy()
+        for move in solution.moves:
+            self.remember(work.get_zobrist(), move)
+            work.apply_move(move)
+        return solution.moves[0]
+
+
+    def request(self, state):
+        """
+            Method request starts looking for the next move of a board.
+            Parameters:
+                state (BoardState): board to give a hint for
+            Returns Future of the board position of the tile to move, or
+            of None if the board is solved or the search ran out of time
+        """
+        if state.is_solved():
+            return self.answer(None)
+        key = state.get_zobrist()
+        pos = self.cached(key)
+        if pos is not None:
+            self.hits += 1
+            return self.answer(None if pos == NO_HINT else pos)
+        future = self.pending.get(key)
+        if future is None or future.done():
+            self.misses += 1
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="hints")
+            # searches that finished are in the cache by now
+            self.pending = {waiting: running for waiting, running
+                            in self.pending.items() if not running.done()}
+            future = self.executor.submit(self.search, state.copy())
+            self.pending[key] = future
+        return future
+
+
+    def answer(self, pos):
+        """
+            Method answer returns a finished Future holding pos.
+        """
+        future = Future()
+        future.set_result(pos)
+        return future
+
+
+    def hint(self, state):
+        """
+            Method hint returns the optimal next move of a board, waiting
+            for the search.
+            Parameters:
+                state (BoardState): board to give a hint for
+            Returns the board position of the tile to move, or None if
+            the board is solved or the search ran out of time
+        """
+        return self.request(state).result()
+
+
+    def clear(self):
+        """
+            Method clear forgets every cached position.
+        """
+        with self.lock:
+            self.cache.clear()
+
+
+    def close(self):
+        """
+            Method close stops a running search and the background
+            thread, so quitting does not wait for it.
+        """
+        self.stop.set()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        for heuristic in self.heuristics.values():
+            if heuristic is not None:
+                heuristic.close()
+        self.heuristics = {}
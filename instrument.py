@@ -0,0 +1,254 @@
+import atexit, functools, json, os, threading, time
+
+# environment variable naming the report written at exit, see enable
+PROFILE_VARIABLE = "PUZZLE_PROFILE"
+# spans kept for the Chrome trace, later ones are only counted
+MAX_EVENTS = 100000
+# histogram buckets per power of two, each at most 12.5% wide
+SUB_BUCKETS = 8
+
+# spans are only timed while this is True
+ENABLED = False
+_histograms = {} # span name -> Histogram
+_events = [] # (name, start ns, duration ns, thread id) for the trace
+_lock = threading.Lock()
+_origin = time.perf_counter_ns()
+
+
+class Histogram:
+    """
+        Histogram Class counts durations in log-spaced buckets, so
+        percentiles are found without keeping every sample.
+    """
+
+    def __init__(self):
+        """
+            Method __init__ initializes an empty histogram.
+        """
+        self.buckets = {} # bucket index -> count
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+
+    @staticmethod
+    def bucket(value):
+        """
+            Method bucket returns the bucket of a duration in ns: the
+            power of two it falls in and the next three bits below.
+        """
+        if value < SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - 4
+        return (shift + 1) * SUB_BUCKETS + ((value >> shift) & 7)
+
+
+    @staticmethod
+    def bucket_value(index):
+        """
+            Method bucket_value returns the middle of a bucket in ns.
+        """
+        if index < SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        low = (SUB_BUCKETS + index % SUB_BUCKETS) << shift
+        return low + (1 << shift) // 2
+
+
+    def add(self, value):
+        """
+            Method add records a duration.
+            Parameters:
+                value (int): duration in ns
+        """
+        index = self.bucket(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+
+    def percentile(self, fraction):
+        """
+            Method percentile returns the duration in ns below which
+            fraction of the samples fall.
+            Parameters:
+                fraction (float): 0.5 for the median, 0.99 for p99
+        """
+        if not self.count:
+            return 0
+        wanted = fraction * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= wanted:
+                return min(self.bucket_value(index), self.max)
+        return self.max
+
+
+    def summary(self):
+        """
+            Method summary returns the count and the p50, p99, max and
+            mean durations in ms.
+        """
+        return {"count": self.count,
+                "p50_ms": self.percentile(0.5) / 1e6,
+                "p99_ms": self.percentile(0.99) / 1e6,
+                "max_ms": self.max / 1e6,
+                "mean_ms": self.total / self.count / 1e6 if self.count else 0}
+
+
+def record(name, start, duration):
+    """
+        Function record adds a finished span.
+        Parameters:
+            name (str): span name
+            start (int): perf_counter_ns when it started
+            duration (int): length in ns
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(duration)
+        if len(_events) < MAX_EVENTS:
+            _events.append((name, start, duration, threading.get_ident()))
+
+
+class span:
+    """
+        span Class times a block of code while instrumentation is on:
+
+            with instrument.span("leaderboard.save"):
+                ...
+    """
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+
+    def __enter__(self):
+        if ENABLED:
+            self.start = time.perf_counter_ns()
+        return self
+
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            record(self.name, self.start,
+                   time.perf_counter_ns() - self.start)
+        return False
+
+
+def timed(name):
+    """
+        Function timed decorates a function so each call is a span.
+        While instrumentation is off a call costs one flag check.
+        Parameters:
+            name (str): span name
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+def enable(report_file=None):
+    """
+        Function enable turns instrumentation on.
+        Parameters:
+            report_file (str): report written at exit, see save
+    """
+    global ENABLED
+    ENABLED = True
+    if report_file:
+        atexit.register(save, report_file)
+
+
+def disable():
+    """
+        Function disable turns instrumentation off, keeping the data.
+    """
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """
+        Function reset forgets every recorded span.
+    """
+    with _lock:
+        _histograms.clear()
+        del _events[:]
+
+
+def summary():
+    """
+        Function summary returns the histogram summary of each span.
+    """
+    with _lock:
+        return {name: _histograms[name].summary()
+                for name in sorted(_histograms)}
+
+
+def text_report():
+    """
+        Function text_report returns the summary as a table.
+    """
+    lines = [f"{'span':28} {'count':>8} {'p50 ms':>9} {'p99 ms':>9} "
+             f"{'max ms':>9}"]
+    for name, row in summary().items():
+        lines.append(f"{name:28} {row['count']:8} {row['p50_ms']:9.3f} "
+                     f"{row['p99_ms']:9.3f} {row['max_ms']:9.3f}")
+    return "\n".join(lines)
+
+
+def chrome_trace():
+    """
+        Function chrome_trace returns the recorded spans in the Chrome
+        trace event format, for chrome://tracing or Perfetto.
+    """
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+    return {"traceEvents": [
+        {"name": name, "ph": "X", "pid": pid, "tid": tid,
+         "ts": (start - _origin) / 1000, "dur": duration / 1000}
+        for name, start, duration, tid in events],
+        "displayTimeUnit": "ms"}
+
+
+def save(file_name, fmt=None):
+    """
+        Function save writes a report.
+        Parameters:
+            file_name (str): file to write
+            fmt (str): "text", "json" or "trace"; if None it is chosen
+                       from the file name: *.trace.json is a Chrome
+                       trace, *.json a JSON summary, anything else text
+    """
+    if fmt is None:
+        if file_name.endswith(".trace.json"):
+            fmt = "trace"
+        elif file_name.endswith(".json"):
+            fmt = "json"
+        else:
+            fmt = "text"
+    with open(file_name, "w") as outfile:
+        if fmt == "trace":
+            json.dump(chrome_trace(), outfile)
+        elif fmt == "json":
+            json.dump(summary(), outfile, indent=2)
+        else:
+            outfile.write(text_report() + "\n")
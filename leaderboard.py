@@ -0,0 +1,457 @@
+import bisect, heapq, itertools, os, time
+
+# leaderboards shown on screen only need the best few scores
+TOP_SIZE = 10
+
+
+def parse_entry(line):
+    """
+        Function parse_entry turns a "moves:name" line into a tuple.
+        Returns tuple of moves, name, or None for a blank or bad line
+    """
+    line = line.split(':', 1)
+    if len(line) > 1:
+        try:
+            return int(line[0]), line[1].strip()
+        except ValueError:
+            return None
+    return None
+
+
+def format_entry(entry):
+    """
+        Function format_entry turns a (moves, name) tuple into a line.
+    """
+    return f"{entry[0]}:{entry[1].strip()}\n"
+
+
+def moves_of(entry):
+    """
+        Function moves_of is the sort key of an entry.
+    """
+    return entry[0]
+
+
+class LeaderboardStore:
+    """
+        LeaderboardStore Class keeps a leaderboard as a sorted file plus
+        an append-only log of the entries added since the sorted file was
+        last rewritten. Adding an entry appends one line; reading the top
+        scores only reads that many lines of the sorted file. Once the
+        log grows past compact_every lines it is merged into the sorted
+        file. Several games may share the files, so the log is read
+        again from disk whenever it has changed.
+    """
+
+    def __init__(self, file_name="leaders.txt", compact_every=1000):
+        """
+            Method __init__ opens a leaderboard, replaying its log.
+            Parameters:
+                file_name (str): sorted "moves:name" file
+                compact_every (int): log entries allowed before merging
+        """
+        self.file_name = file_name
+        self.log_name = file_name + ".log"
+        # the log is renamed to this while it is merged
+        self.merging_name = file_name + ".merging"
+        self.compact_every = compact_every
+        self.pending = [] # log entries, sorted by moves, oldest first
+        self.log_id = None # (device, inode) of the log read, and whether
+        self.log_offset = 0 # a merge was running, and bytes read so far
+        self.reload()
+
+
+    def read_log(self, file_name):
+        """
+            Method read_log returns the entries of a log file in the
+            order they were added, or none if it is missing.
+        """
+        try:
+            with open(file_name, "r") as infile:
+                return [entry for entry in map(parse_entry, infile)
+                        if entry is not None]
+        except FileNotFoundError:
+            return []
+
+
+    def log_state(self):
+        """
+            Method log_state returns the log's identity, which changes
+            when any game compacts it, and its size.
+        """
+        merging = os.path.exists(self.merging_name)
+        try:
+            stat = os.stat(self.log_name)
+        except FileNotFoundError:
+            return (None, merging), 0
+        return (stat.st_dev, stat.st_ino, merging), stat.st_size
+
+
+    def reload(self):
+        """
+            Method reload reads the whole log, and the log being merged
+            if a merge is running or was cut short.
+        """
+        self.log_id, size = self.log_state()
+        self.pending = []
+        for entry in self.read_log(self.merging_name):
+            bisect.insort(self.pending, entry, key=moves_of)
+        self.log_offset = 0
+        self.read_new(size)
+
+
+    def read_new(self, size):
+        """
+            Method read_new adds the complete log lines past the part
+            already read.
+            Parameters:
+                size (int): size of the log
+        """
+        if size <= self.log_offset:
+            return
+        try:
+            with open(self.log_name, "rb") as infile:
+                infile.seek(self.log_offset)
+                data = infile.read(size - self.log_offset)
+        except FileNotFoundError:
+            return
+        # a line still being written is read next time
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].decode("utf-8").splitlines():
+            entry = parse_entry(line)
+            if entry is not None:
+                bisect.insort(self.pending, entry, key=moves_of)
+        self.log_offset += end
+
+
+    def refresh(self):
+        """
+            Method refresh picks up log lines other games have added, or
+            reads the log again if another game has compacted it.
+        """
+        log_id, size = self.log_state()
+        if log_id != self.log_id or size < self.log_offset:
+            self.reload()
+        else:
+            self.read_new(size)
+
+
+    def exists(self):
+        """
+            Method exists checks if the leaderboard has been saved before.
+        """
+        return os.path.exists(self.file_name) or \
+               os.path.exists(self.log_name) or \
+               os.path.exists(self.merging_name)
+
+
+    def read_sorted(self):
+        """
+            Method read_sorted yields the entries of the sorted file
+            lazily, so callers only read as far as they need.
+        """
+        if not os.path.exists(self.file_name):
+            return
+        with open(self.file_name, "r") as infile:
+            for line in infile:
+                entry = parse_entry(line)
+                if entry is not None:
+                    yield entry
+
+
+    def entries(self):
+        """
+            Method entries yields every entry from best to worst. Ties
+            keep the order they were added in.
+        """
+        self.refresh()
+        return heapq.merge(self.read_sorted(), self.pending, key=moves_of)
+
+
+    def top(self, k=TOP_SIZE):
+        """
+            Method top returns the k best entries.
+            Parameters:
+                k (int): number of entries to return
+            Returns list of (moves, name) tuples
+        """
+        return list(itertools.islice(self.entries(), k))
+
+
+    def add(self, moves, name):
+        """
+            Method add records a score. The log line is flushed to disk
+            before returning.
+            Parameters:
+                moves (int): number of moves taken
+                name (str): name of the player
+        """
+        entry = (int(moves), name.strip())
+        with open(self.log_name, "a") as outfile:
+            outfile.write(format_entry(entry))
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        self.refresh() # reads the new line and any other game's
+        if len(self.pending) >= self.compact_every:
+            self.compact()
+
+
+    def record_game(self, moves, name, won):
+        """
+            Method record_game adds a finished game. The text leaderboard
+            only keeps wins, so lost games are not stored.
+            Parameters:
+                moves (int): number of moves taken
+                name (str): name of the player
+                won (bool): True if the puzzle was solved
+        """
+        if won:
+            self.add(moves, name)
+
+
+    def compact(self):
+        """
+            Method compact merges the log into the sorted file. The log
+            is renamed first, so lines other games append meanwhile go
+            to a new log, and the renamed file is read from disk rather
+            than from memory. The new sorted file is written beside the
+            old one and swapped in before the renamed log is removed, so
+            a crash never loses an entry.
+        """
+        if not os.path.exists(self.merging_name): # else a merge was cut short
+            try:
+                os.rename(self.log_name, self.merging_name)
+            except FileNotFoundError:
+                pass
+        merging = self.read_log(self.merging_name)
+        merging.sort(key=moves_of)
+        self.write_sorted(heapq.merge(self.read_sorted(), merging,
+                                      key=moves_of))
+        self.remove(self.merging_name)
+        self.reload()
+
+
+    def replace(self, entries):
+        """
+            Method replace overwrites the leaderboard with entries,
+            dropping the log.
+            Parameters:
+                entries (iterable): (moves, name) tuples, best first
+        """
+        self.write_sorted(entries)
+        # entries are in the sorted file now, the logs can go
+        self.remove(self.log_name)
+        self.remove(self.merging_name)
+        self.reload()
+
+
+    def write_sorted(self, entries):
+        """
+            Method write_sorted writes entries beside the sorted file and
+            swaps them in.
+            Parameters:
+                entries (iterable): (moves, name) tuples, best first
+        """
+        temp_name = f"{self.file_name}.{os.getpid()}.tmp"
+        with open(temp_name, "w") as outfile:
+            for entry in entries:
+                outfile.write(format_entry(entry))
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(temp_name, self.file_name)
+
+
+    def remove(self, file_name):
+        """
+            Method remove deletes a file another game may have deleted
+            already.
+        """
+        try:
+            os.remove(file_name)
+        except FileNotFoundError:
+            pass
+
+
+class SqliteLeaderboard:
+    """
+        SqliteLeaderboard Class keeps every finished game in an SQLite
+        database and reads the leaderboard from the won games. The
+        database runs in WAL mode so several game instances can write
+        to it at once, and games are indexed by puzzle and moves so top
+        scores are read straight from the index. It has the same methods
+        as LeaderboardStore.
+    """
+
+    def __init__(self, file_name="leaders.db", puzzle=None):
+        """
+            Method __init__ opens (or creates) the database.
+            Parameters:
+                file_name (str): SQLite database file
+                puzzle (str): puzzle name, shared leaderboard if None
+        """
+        import sqlite3 # only needed when the database is used
+        self.file_name = file_name
+        self.puzzle = puzzle or ""
+        self.created = not os.path.exists(file_name)
+        # wait for other writers instead of failing straight away
+        self.connection = sqlite3.connect(file_name, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS games (
+                id INTEGER PRIMARY KEY,
+                puzzle TEXT NOT NULL,
+                name TEXT NOT NULL,
+                moves INTEGER NOT NULL,
+                won INTEGER NOT NULL,
+                played REAL NOT NULL)""")
+            self.connection.execute("""CREATE INDEX IF NOT EXISTS
+                games_by_moves ON games (puzzle, won, moves, id)""")
+            # one-off jobs already done on the database, e.g. migration
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL)""")
+
+
+    def exists(self):
+        """
+            Method exists checks if the database was there before it
+            was opened or has had games added since.
+        """
+        return not self.created or self.connection.execute(
+            "SELECT 1 FROM games LIMIT 1").fetchone() is not None
+
+
+    def entries(self):
+        """
+            Method entries yields every won game from best to worst.
+            Ties keep the order they were added in.
+        """
+        return iter(self.connection.execute(
+            "SELECT moves, name FROM games WHERE puzzle = ? AND won = 1 "
+            "ORDER BY moves, id", (self.puzzle,)))
+
+
+    def top(self, k=TOP_SIZE):
+        """
+            Method top returns the k best entries.
+            Parameters:
+                k (int): number of entries to return
+            Returns list of (moves, name) tuples
+        """
+        return self.connection.execute(
+            "SELECT moves, name FROM games WHERE puzzle = ? AND won = 1 "
+            "ORDER BY moves, id LIMIT ?", (self.puzzle, k)).fetchall()
+
+
+    def add_many(self, entries, won=True):
+        """
+            Method add_many records many games in one transaction.
+            Parameters:
+                entries (iterable): (moves, name) tuples
+                won (bool): True if the games were solved
+        """
+        with self.connection:
+            self.insert(entries, won)
+
+
+    def insert(self, entries, won):
+        """
+            Method insert adds games inside the transaction already open
+            on the connection.
+            Parameters:
+                entries (iterable): (moves, name) tuples
+                won (bool): True if the games were solved
+        """
+        played = time.time()
+        self.connection.executemany(
+            "INSERT INTO games (puzzle, name, moves, won, played) "
+            "VALUES (?, ?, ?, ?, ?)",
+            ((self.puzzle, name.strip(), int(moves), int(won), played)
+             for moves, name in entries))
+
+
+    def add(self, moves, name):
+        """
+            Method add records a won game.
+            Parameters:
+                moves (int): number of moves taken
+                name (str): name of the player
+        """
+        self.add_many([(moves, name)])
+
+
+    def record_game(self, moves, name, won):
+        """
+            Method record_game adds a finished game to the history.
+            Parameters:
+                moves (int): number of moves taken
+                name (str): name of the player
+                won (bool): True if the puzzle was solved
+        """
+        self.add_many([(moves, name)], won)
+
+
+    def replace(self, entries):
+        """
+            Method replace overwrites the won games with entries in one
+            transaction, so readers never see an empty leaderboard. Lost
+            games stay in the history.
+            Parameters:
+                entries (iterable): (moves, name) tuples, best first
+        """
+        entries = list(entries)
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM games WHERE puzzle = ? AND won = 1",
+                (self.puzzle,))
+            self.insert(entries, True)
+
+
+    def migrate(self, text_file="leaders.txt"):
+        """
+            Method migrate copies a "moves:name" leaderboard into the
+            database, including entries still in its log. The copy is
+            recorded in the meta table and done under a write lock, so
+            when several game instances open a new database at once only
+            the first one copies the scores.
+            Parameters:
+                text_file (str): leaderboard written by LeaderboardStore
+            Returns True if the entries were copied, False if the
+            database had already been migrated
+        """
+        with self.connection:
+            # take the write lock before checking, not at the insert
+            self.connection.execute("BEGIN IMMEDIATE")
+            if self.connection.execute(
+                    "SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+                return False
+            # databases from before the meta table were filled when new
+            copy = self.connection.execute(
+                "SELECT 1 FROM games LIMIT 1").fetchone() is None
+            if copy:
+                self.insert(LeaderboardStore(text_file).entries(), True)
+            self.connection.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated', ?)",
+                (text_file,))
+        return copy
+
+
+    def close(self):
+        """
+            Method close closes the database connection.
+        """
+        self.connection.close()
+
+
+def store_name(puzzle=None):
+    """
+        Function store_name returns the leaderboard file for a puzzle,
+        or the shared leaderboard if puzzle is None.
+        Parameters:
+            puzzle (str): puzzle name or .puz file
+    """
+    if puzzle is None:
+        return "leaders.txt"
+    puzzle = os.path.splitext(os.path.basename(puzzle))[0]
+    return f"leaders_{puzzle}.txt"
@@ -0,0 +1,220 @@
+import base64
+
+# where the moved tile was, seen from the blank; two bits per move
+UP, DOWN, LEFT, RIGHT = range(4)
+LETTERS = "UDLR"
+OPPOSITE = (DOWN, UP, RIGHT, LEFT)
+MOVES_PER_BYTE = 4
+
+# directions of the four moves packed in each byte value, first move in
+# the low bits
+BYTE_MOVES = tuple(tuple((value >> (2 * n)) & 3 for n in range(MOVES_PER_BYTE))
+                   for value in range(256))
+
+# replay tables by board dimensions: cell -> target cell per direction
+_TARGETS = {}
+
+
+def offset(direction, cols):
+    """
+        Function offset returns how far the tile moved in a direction is
+        from the blank in the flat cell array.
+    """
+    return (-cols, cols, -1, 1)[direction]
+
+
+def direction_of(blank, pos, cols):
+    """
+        Function direction_of returns the direction of the tile at pos,
+        which must be next to the blank.
+        Parameters:
+            blank (int): board position of the blank
+            pos (int): board position of the tile to move
+            cols (int): number of columns on the board
+    """
+    return (-cols, cols, -1, 1).index(pos - blank)
+
+
+def target_table(rows, cols):
+    """
+        Function target_table returns, for every blank position, the
+        position of the tile in each direction or -1 off the board.
+    """
+    key = (rows, cols)
+    table = _TARGETS.get(key)
+    if table is None:
+        table = []
+        for blank in range(rows * cols):
+            row, col = divmod(blank, cols)
+            table.append((blank - cols if row > 0 else -1,
+                          blank + cols if row < rows - 1 else -1,
+                          blank - 1 if col > 0 else -1,
+                          blank + 1 if col < cols - 1 else -1))
+        table = tuple(table)
+        _TARGETS[key] = table
+    return table
+
+
+class MoveLog:
+    """
+        MoveLog Class records the moves of a game packed four to a byte.
+        Undone moves stay in the log after the cursor until a new move
+        is made, so they can be redone.
+    """
+
+    def __init__(self, data=b"", length=0):
+        """
+            Method __init__ initializes a log.
+            Parameters:
+                data (bytes): packed moves
+                length (int): number of moves in data
+        """
+        self.data = bytearray(data)
+        self.length = length # moves stored, including undone ones
+        self.cursor = length # moves made and not undone
+
+
+    def __len__(self):
+        return self.cursor
+
+
+    def get(self, index):
+        """
+            Method get returns the direction of a move.
+            Parameters:
+                index (int): 0-based move number
+        """
+        byte, slot = divmod(index, MOVES_PER_BYTE)
+        return (self.data[byte] >> (2 * slot)) & 3
+
+
+    def append(self, direction):
+        """
+            Method append records a move, dropping any undone moves.
+            Parameters:
+                direction (int): UP, DOWN, LEFT or RIGHT
+        """
+        byte, slot = divmod(self.cursor, MOVES_PER_BYTE)
+        if slot == 0:
+            del self.data[byte:]
+            self.data.append(direction)
+        else:
+            del self.data[byte + 1:]
+            # keep the earlier moves in the byte, clear the later ones
+            self.data[byte] = (self.data[byte] & ((1 << (2 * slot)) - 1)) \
+                              | (direction << (2 * slot))
+        self.cursor += 1
+        self.length = self.cursor
+
+
+    def undo(self):
+        """
+            Method undo steps back one move.
+            Returns the direction of the undone move, or None
+        """
+        if self.cursor == 0:
+            return None
+        self.cursor -= 1
+        return self.get(self.cursor)
+
+
+    def redo(self):
+        """
+            Method redo steps forward over an undone move.
+            Returns the direction of the redone move, or None
+        """
+        if self.cursor == self.length:
+            return None
+        self.cursor += 1
+        return self.get(self.cursor - 1)
+
+
+    def clear(self):
+        """
+            Method clear forgets every move.
+        """
+        self.data = bytearray()
+        self.length = self.cursor = 0
+
+
+    def directions(self):
+        """
+            Method directions returns the moves made, in order.
+        """
+        return [self.get(i) for i in range(self.cursor)]
+
+
+    def to_string(self):
+        """
+            Method to_string encodes the moves made as "count.base64".
+        """
+        data = bytes(self.data[:(self.cursor + 3) // MOVES_PER_BYTE])
+        return f"{self.cursor}." + \
+               base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+    @classmethod
+    def from_string(cls, text):
+        """
+            Method from_string decodes a log written by to_string.
+            Raises ValueError if the text is not a move log
+        """
+        count, separator, encoded = text.partition(".")
+        if not separator or not count.isdigit():
+            raise ValueError(f"not a move log: {text!r}")
+        data = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+        if len(data) != (int(count) + 3) // MOVES_PER_BYTE:
+            raise ValueError(f"move log holds {len(data)} bytes "
+                             f"for {count} moves")
+        return cls(data, int(count))
+
+
+    def __str__(self):
+        return "".join(LETTERS[d] for d in self.directions())
+
+
+def replay(start, text, moves_allowed=None):
+    """
+        Function replay checks a recorded game: every move must be legal,
+        the game must end solved, and within moves_allowed if given.
+        Parameters:
+            start (BoardState): layout the game started from
+            text (str): moves written by MoveLog.to_string
+            moves_allowed (int): most moves the player was allowed
+        Returns True if the game is a valid win
+    """
+    count, separator, encoded = text.partition(".")
+    if not separator or not count.isdigit():
+        return False
+    count = int(count)
+    if moves_allowed is not None and count > moves_allowed:
+        return False
+    try:
+        data = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    except ValueError:
+        return False
+    if len(data) != (count + 3) // MOVES_PER_BYTE:
+        return False
+
+    targets = target_table(start.rows, start.cols)
+    cells = bytearray(start.cells)
+    blank = start.blank
+    blank_tile = start.blank_tile
+    full, rest = divmod(count, MOVES_PER_BYTE)
+    for value in data[:full]:
+        for direction in BYTE_MOVES[value]:
+            pos = targets[blank][direction]
+            if pos < 0:
+                return False
+            cells[blank] = cells[pos]
+            blank = pos
+    if rest:
+        for direction in BYTE_MOVES[data[full]][:rest]:
+            pos = targets[blank][direction]
+            if pos < 0:
+                return False
+            cells[blank] = cells[pos]
+            blank = pos
+    cells[blank] = blank_tile
+    # solved means every cell holds its own tile
+    return cells == bytes(range(start.size))
@@ -0,0 +1,331 @@
+import argparse, mmap, struct, sys, time
+from array import array
+from BoardState import neighbour_table
+
+# file layout: header, one entry per pattern, then the nibble tables
+MAGIC = b"SPDB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBB")    # magic, version, rows, cols, patterns
+ENTRY = struct.Struct("<BQQ")        # tiles in pattern, offset, entries
+# largest stored value, lookups clamp here which keeps them admissible
+MAX_NIBBLE = 15
+
+
+def pattern_size(cells, k):
+    """
+        Function pattern_size returns the number of ways to place k
+        pattern tiles on cells board positions.
+    """
+    count = 1
+    for i in range(k):
+        count *= cells - i
+    return count
+
+
+def rank(positions, cells):
+    """
+        Function rank maps the board positions of the pattern tiles to
+        an index in 0..pattern_size(cells, len(positions)) - 1.
+        Parameters:
+            positions (sequence): board position of each pattern tile
+            cells (int): number of cells on the board
+    """
+    index = 0
+    used = 0 # bit mask of positions taken by earlier tiles
+    for i in range(len(positions)):
+        pos = positions[i]
+        smaller = (used & ((1 << pos) - 1)).bit_count()
+        index = index * (cells - i) + pos - smaller
+        used |= 1 << pos
+    return index
+
+
+def unrank(index, k, cells):
+    """
+        Function unrank is the inverse of rank.
+        Parameters:
+            index (int): rank of the pattern placement
+            k (int): number of tiles in the pattern
+            cells (int): number of cells on the board
+        Returns list of board positions
+    """
+    digits = []
+    for i in range(k - 1, -1, -1):
+        index, digit = divmod(index, cells - i)
+        digits.append(digit)
+    digits.reverse()
+
+    free = list(range(cells))
+    positions = []
+    for digit in digits:
+        positions.append(free.pop(digit))
+    return positions
+
+
+def partition(rows, cols, sizes):
+    """
+        Function partition splits the tiles into consecutive patterns.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+            sizes (list): number of tiles in each pattern, e.g. [5, 5, 5]
+        Returns list of tuples of 0-based tiles
+    """
+    if sum(sizes) != rows * cols - 1:
+        raise ValueError(f"pattern sizes {sizes} do not cover the "
+                         f"{rows * cols - 1} tiles")
+    patterns = []
+    start = 0
+    for size in sizes:
+        patterns.append(tuple(range(start, start + size)))
+        start += size
+    return patterns
+
+
+def build_table(rows, cols, pattern):
+    """
+        Function build_table finds the fewest pattern-tile moves that
+        solve every placement of the pattern tiles, by breadth first
+        search backwards from the goal. Moving a tile outside the
+        pattern is free, which makes tables of disjoint patterns
+        additive.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+            pattern (tuple): 0-based tiles in the pattern
+        Returns bytearray of move counts indexed by rank
+    """
+    cells = rows * cols
+    k = len(pattern)
+    neighbours = neighbour_table(rows, cols)
+    entries = pattern_size(cells, k)
+    unset = 255
+    table = bytearray([unset]) * entries
+    # a search state is the pattern rank and the blank position
+    seen = bytearray(entries * cells)
+
+    frontier = array("I", [rank(pattern, cells) * cells + cells - 1])
+    level = 0
+    while frontier:
+        following = array("I")
+        for state in frontier:
+            if seen[state]:
+                continue
+            index, blank = divmod(state, cells)
+            if table[index] == unset:
+                table[index] = level
+            # the blank wanders between the pattern tiles for free, so
+            # every cell it can reach is expanded with one unrank
+            positions = unrank(index, k, cells)
+            base = index * cells
+            seen[state] = 1
+            region = [blank]
+            for empty in region:
+                for pos in neighbours[empty]:
+                    if pos in positions:
+                        # pattern tile slides into the blank: one move
+                        moved = positions[:]
+                        moved[positions.index(pos)] = empty
+                        child = rank(moved, cells) * cells + pos
+                        if not seen[child]:
+                            following.append(child)
+                    elif not seen[base + pos]:
+                        seen[base + pos] = 1
+                        region.append(pos)
+        frontier = following
+        level += 1
+    return table
+
+
+def pack_table(table, rows, cols, pattern):
+    """
+        Function pack_table stores each entry as half its distance above
+        the pattern's Manhattan distance, two entries per byte. The
+        difference is always even because each pattern move changes one
+        tile's Manhattan distance by one.
+        Returns bytearray of packed nibbles
+    """
+    cells = rows * cols
+    k = len(pattern)
+    homes = [divmod(tile, cols) for tile in pattern]
+    packed = bytearray((len(table) + 1) // 2)
+    for index in range(len(table)):
+        manhattan = 0
+        positions = unrank(index, k, cells)
+        for i in range(k):
+            row, col = divmod(positions[i], cols)
+            manhattan += abs(row - homes[i][0]) + abs(col - homes[i][1])
+        nibble = min((table[index] - manhattan) // 2, MAX_NIBBLE)
+        if index & 1:
+            packed[index >> 1] |= nibble << 4
+        else:
+            packed[index >> 1] |= nibble
+    return packed
+
+
+def build(rows, cols, patterns, file_name, verbose=False):
+    """
+        Function build computes the tables for disjoint patterns and
+        writes them to file_name.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+            patterns (list): tuples of 0-based tiles, disjoint
+            file_name (str): database file to write
+            verbose (bool): True to print progress
+    """
+    tables = []
+    for pattern in patterns:
+        start = time.perf_counter()
+        table = build_table(rows, cols, pattern)
+        tables.append(pack_table(table, rows, cols, pattern))
+        if verbose:
+            print(f"pattern {pattern}: {len(table)} entries in "
+                  f"{time.perf_counter() - start:.1f}s")
+
+    header_size = HEADER.size + sum(ENTRY.size + len(pattern)
+                                    for pattern in patterns)
+    with open(file_name, "wb") as outfile:
+        outfile.write(HEADER.pack(MAGIC, VERSION, rows, cols, len(patterns)))
+        offset = header_size
+        for pattern, packed in zip(patterns, tables):
+            outfile.write(ENTRY.pack(len(pattern), offset,
+                                     pattern_size(rows * cols, len(pattern))))
+            outfile.write(bytes(pattern))
+            offset += len(packed)
+        for packed in tables:
+            outfile.write(packed)
+
+
+class PatternDatabase:
+    """
+        PatternDatabase Class is an additive pattern database heuristic
+        for the solver. The tables are memory-mapped read only, so every
+        process that loads the same file shares one copy in the page
+        cache. It has the same reset/moved interface as
+        solver.LinearConflict.
+    """
+
+    def __init__(self, file_name):
+        """
+            Method __init__ maps a database written by build.
+            Parameters:
+                file_name (str): database file to load
+        """
+        with open(file_name, "rb") as infile:
+            self.data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, rows, cols, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{file_name} is not a pattern database")
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+
+        self.patterns = []
+        self.offsets = []
+        offset = HEADER.size
+        for i in range(count):
+            k, data_offset, entries = ENTRY.unpack_from(self.data, offset)
+            offset += ENTRY.size
+            self.patterns.append(tuple(self.data[offset:offset + k]))
+            self.offsets.append(data_offset)
+            offset += k
+
+        # which pattern each tile belongs to and where in that pattern
+        self.pattern_of = [None] * self.cells
+        self.slot_of = [None] * self.cells
+        for p in range(len(self.patterns)):
+            for slot in range(len(self.patterns[p])):
+                tile = self.patterns[p][slot]
+                self.pattern_of[tile] = p
+                self.slot_of[tile] = slot
+
+        blank_tile = self.cells - 1
+        self.distance = []
+        for tile in range(self.cells):
+            home_row, home_col = divmod(tile, cols)
+            self.distance.append([
+                0 if tile == blank_tile else
+                abs(pos // cols - home_row) + abs(pos % cols - home_col)
+                for pos in range(self.cells)])
+
+
+    def lookup(self, p, positions):
+        """
+            Method lookup returns the stored nibble for pattern p.
+            Parameters:
+                p (int): index of the pattern
+                positions (list): board position of each pattern tile
+        """
+        index = rank(positions, self.cells)
+        byte = self.data[self.offsets[p] + (index >> 1)]
+        if index & 1:
+            return byte >> 4
+        return byte & 0xf
+
+
+    def reset(self, cells):
+        """
+            Method reset scores a whole board from scratch.
+            Parameters:
+                cells (array): 0-based tile at each position
+            Returns the heuristic value
+        """
+        where = [0] * self.cells
+        manhattan = 0
+        for pos in range(self.cells):
+            where[cells[pos]] = pos
+            manhattan += self.distance[cells[pos]][pos]
+        self.positions = [[where[tile] for tile in pattern]
+                          for pattern in self.patterns]
+        self.nibbles = [self.lookup(p, self.positions[p])
+                        for p in range(len(self.patterns))]
+        self.value = manhattan + 2 * sum(self.nibbles)
+        return self.value
+
+
+    def moved(self, cells, tile, src, dst):
+        """
+            Method moved updates the score after tile slid from src to dst.
+            Only the pattern holding the tile needs a new lookup.
+            Returns the heuristic value
+        """
+        distance = self.distance[tile]
+        p = self.pattern_of[tile]
+        positions = self.positions[p]
+        positions[self.slot_of[tile]] = dst
+        nibble = self.lookup(p, positions)
+        self.value += distance[dst] - distance[src] + \
+                      2 * (nibble - self.nibbles[p])
+        self.nibbles[p] = nibble
+        return self.value
+
+
+    def close(self):
+        """
+            Method close unmaps the database file.
+        """
+        self.data.close()
+
+
+def main(argv=None):
+    """
+        Function main builds a pattern database from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Build an additive pattern database for the solver.")
+    parser.add_argument("output", help="database file to write")
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--partition", default="5-5-5",
+                        help="tiles per pattern, e.g. 5-5-5 or 6-6-3; "
+                             "see the README for build and solve times")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.partition.split("-")]
+    patterns = partition(args.rows, args.cols, sizes)
+    build(args.rows, args.cols, patterns, args.output, verbose=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
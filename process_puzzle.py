@@ -1,5 +1,76 @@
+import os, sys
+import scramble
+from assets import slice_names
+from PuzzleSpec import PuzzleSpec, dimensions
+
+COMPILED_EXTENSION = ".puzc"
+# parsed puzzles by file name, with the file's (mtime, size) when parsed
+_specs = {}
+
+
+def compiled_name(file_name):
+    """
+        Function compiled_name returns the compiled file for a .puz file.
+    """
+    return os.path.splitext(file_name)[0] + COMPILED_EXTENSION
+
+
+def read_spec(file_name):
+    """
+        Function read_spec reads a puzzle file from disk. Compiled files
+        are decoded from a single read; a .puz file with an up to date
+        compiled copy beside it is read from that copy.
+        Parameters:
+            file_name (str): .puz or .puzc file
+        Returns PuzzleSpec
+    """
+    compiled = compiled_name(file_name)
+    if not file_name.endswith(COMPILED_EXTENSION) and \
+       os.path.exists(compiled) and \
+       os.path.getmtime(compiled) >= os.path.getmtime(file_name):
+        file_name = compiled
+
+    if file_name.endswith(COMPILED_EXTENSION):
+        with open(file_name, "rb") as infile:
+            return PuzzleSpec.from_bytes(infile.read(), file_name)
+    with open(file_name, "r") as infile:
+        return PuzzleSpec.parse(infile.read(), file_name, slice_names)
+
+
+def load_puzzle(file_name):
+    """
+        Function load_puzzle returns the validated puzzle in file_name.
+        Puzzles are cached and only read again once the file changes.
+        Parameters:
+            file_name (str): .puz or .puzc file
+        Returns PuzzleSpec. Raises FileNotFoundError for a missing file
+        and PuzzleFormatError for a malformed one
+    """
+    stat = os.stat(file_name)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _specs.get(file_name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    spec = read_spec(file_name)
+    _specs[file_name] = (version, spec)
+    return spec
+
+
+def compile_puzzle(file_name, output=None):
+    """
+        Function compile_puzzle writes the compiled copy of a .puz file.
+        Parameters:
+            file_name (str): .puz file to compile
+            output (str): file to write, beside the .puz file if None
+        Returns name of the compiled file
+    """
+    with open(file_name, "r") as infile:
+        spec = PuzzleSpec.parse(infile.read(), file_name, slice_names)
+    output = output or compiled_name(file_name)
+    with open(output, "wb") as outfile:
+        outfile.write(spec.to_bytes())
+    return output
 
-import random, time
 
 def process_file(file_name, tr, screen):
     """
@@ -8,35 +79,35 @@ def process_file(file_name, tr, screen):
             file_name (txt): .puz file with metadata
         Returns dictionary with parsed metadata
     """
-    puzzle_info = {"tiles": []}
-    # open file, parse info
-    with open(file_name, "r") as infile:
-        for line in infile:
-            lst = line.split(": ")
-            lst[1] = lst[1].replace("\n", "")
-            # creates dictionary. All metadata parsed
-            if lst[0].lower() == "name" or lst[0].lower() == "number" or \
-                   lst[0].lower() == "size" or lst[0].lower() == "thumbnail":
-                puzzle_info[lst[0].lower()] = lst[1]
-            else:
-                # All tiles placed into one list
-                puzzle_info[lst[0]] = lst[1]
-                puzzle_info["tiles"].append((int(lst[0]), lst[1]))
+    return load_puzzle(file_name).to_dict()
 
-    return puzzle_info
 
-
-def randomize(tiles):
+def randomize(tiles, mode="permutation", depth=None, seed=None,
+              rows=None, cols=None):
     """
         Function randomize takes an ordered list of tiles and returns
-        a new, separate, unordered list of tiles.
+        a new, separate, unordered list of tiles. The order is always
+        solvable, see scramble.scramble for the modes.
         Parameters:
-            tiles (list): ordered list of tiles
+            tiles (list): ordered list of tiles, blank last
+            mode (str): "permutation", "walk" or "difficulty"
+            depth (int): walk length or optimal solution length
+            seed (int): optional seed for a reproducible board
+            rows (int): rows on the board, square board if None
+            cols (int): columns on the board, square board if None
         Return:
             tiles_copy (list): unordered list of tiles
+        Raises ValueError if the tiles do not fill the board
     """
-    tiles_copy = tiles[:] # temp list for ordering
-    randomized_tiles = []
-    random.shuffle(tiles_copy)
+    rows, cols = dimensions(len(tiles), rows, cols)
+    state = scramble.scramble(rows, cols, mode, depth, seed)
+    # place each tile where the scrambled state put it
+    tiles_copy = [tiles[tile] for tile in state.cells]
 
     return tiles_copy
+
+
+if __name__ == "__main__":
+    # compile the .puz files given on the command line
+    for puz_file in sys.argv[1:]:
+        print(compile_puzzle(puz_file))
@@ -1,18 +1,33 @@
 
-import turtle, math
-import process_puzzle, gameboard, time
+import time, os, sys
+import backends
+import gameboard
 from Tile import Tile
 from Board import Board
-import logging
+from Overlay import Overlay
+from assets import AssetManager
+from catalogue import Catalogue
+import instrument
 
+# time to interactive is measured from the end of the imports
+STARTED = time.perf_counter()
 
-def set_up_puzzle(tr, screen):
+# puzzle shown when the game starts
+START_PUZZLE = "mario.puz"
+BUTTON_IMAGES = ("Resources/quitbutton.gif", "Resources/loadbutton.gif",
+                 "Resources/resetbutton.gif")
+
+
+def set_up_puzzle(tr, screen, assets=None, inputs=None):
     """
         Function set_up_puzzle sets up Turtle Screen with buttons
         and gameboard.
         Parameters:
             tr (turtle): turtle used to set up board
             screen (screen): screen for the gameboard
+            assets (AssetManager): registers the button images, they
+                                   are added to the screen if None
+            inputs (tuple): name and moves allowed, asked for if None
         Returns list of the tiles for the game.
     """
     
@@ -21,7 +36,9 @@ def set_up_puzzle(tr, screen):
     tr.width(6)
     tr.speed(0)
 
-    name, moves_allowed = user_inputs(screen)
+    if inputs is None:
+        inputs = user_inputs(screen)
+    name, moves_allowed = inputs
     
     # draw gameboard,
     gameboard.draw_rectangle(450, 450, -375, 300, "black", tr)
@@ -31,9 +48,11 @@ def set_up_puzzle(tr, screen):
     gameboard.draw_rectangle(250, 450, 100, 300, "blue", tr)
 
     # add graphics
-    screen.addshape("Resources/quitbutton.gif")
-    screen.addshape("Resources/loadbutton.gif")
-    screen.addshape("Resources/resetbutton.gif")
+    for image in BUTTON_IMAGES:
+        if assets is not None:
+            assets.register(image) # skipped if already preloaded
+        else:
+            screen.addshape(image)
     quit_button = Tile("Resources/quitbutton.gif", 0, 80, 50, 
                                      260, -225, "none", 0, False, True)
     load = Tile("Resources/loadbutton.gif", 0, 80, 80, 
@@ -48,6 +67,7 @@ def splash_screen(tr, screen):
     screen.setup(width=875,height=800) #970, 900
     screen.addshape("Resources/splash_screen.gif")
     tr.shape("Resources/splash_screen.gif")
+    screen.update() # show it before anything else is loaded
 
 def user_inputs(screen):
     """
@@ -63,28 +83,93 @@ def user_inputs(screen):
     return name, moves_allowed
         
 
+def preload_puzzle(screen, catalogue, assets, puzzle_file):
+    """
+        Function preload_puzzle parses a puzzle on a background thread
+        and, once it is parsed, registers its images from screen timers
+        while the player answers the start up dialogs.
+        Parameters:
+            screen (screen): screen whose timers do the registering
+            catalogue (Catalogue): parses the puzzle in the background
+            assets (AssetManager): image cache the board will use
+            puzzle_file (str): puzzle to get ready
+    """
+    catalogue.prefetch(puzzle_file)
+    future = catalogue.prefetched[puzzle_file]
+
+    def register_when_parsed():
+        if not future.done():
+            screen.ontimer(register_when_parsed, 10)
+            return
+        if future.exception() is None: # errors are shown on load
+            puzzle = future.result()
+            if puzzle.image is None: # sliced images are cut on load
+                assets.preload(puzzle.tiles + (puzzle.thumbnail,))
+    screen.ontimer(register_when_parsed, 0)
+
+
+def report_time_to_interactive(waited):
+    """
+        Function report_time_to_interactive prints how long the game took
+        to accept clicks, not counting time spent in the start up
+        dialogs, and records it as an instrument span.
+        Parameters:
+            waited (float): seconds spent waiting for the player
+    """
+    elapsed = time.perf_counter() - STARTED - waited
+    instrument.record("startup.time_to_interactive",
+                      time.perf_counter_ns() - int(elapsed * 1e9),
+                      int(elapsed * 1e9))
+    print(f"time to interactive: {elapsed * 1000:.0f} ms", file=sys.stderr)
+
+
 def main():
     """
-        Main function drives the files and executes the game.
+        Main function drives the files and executes the game. The splash
+        screen is shown first; the first puzzle is parsed and its images
+        registered in the background while the player answers the
+        dialogs, and the solver is only loaded when a hint is asked for.
     """
-    # create main turtle, screen
-    tr = turtle.Turtle()
-    screen = turtle.Screen()
+    # time the hot paths, report written at exit
+    if os.environ.get(instrument.PROFILE_VARIABLE):
+        instrument.enable(os.environ[instrument.PROFILE_VARIABLE])
 
-    leaders = gameboard.open_leaderboard(tr, screen)
-    # start screen and display splash screen
+    # create main turtle, screen and show the splash screen at once
+    screen = backends.make_screen()
+    tr = backends.make_turtle()
     splash_screen(tr, screen)
-    time.sleep(5)
-    
+
+    # get the first puzzle and buttons ready in the background
+    assets = AssetManager(screen)
+    catalogue = Catalogue()
+    preload_puzzle(screen, catalogue, assets, START_PUZZLE)
+    assets.preload(BUTTON_IMAGES)
+    overlay = Overlay(screen, assets) # messages that don't block clicks
+
+    # shared SQLite leaderboard for several game instances, if set
+    if os.environ.get("PUZZLE_LEADERBOARD_DB"):
+        gameboard.use_sqlite_leaderboard(os.environ["PUZZLE_LEADERBOARD_DB"])
+
+    leaders = gameboard.open_leaderboard(tr, screen, overlay)
+
     # user inputs and puzzle set up
-    buttons, name, moves_allowed = set_up_puzzle(tr, screen)
-    board = Board(tr, screen, "mario.puz", moves_allowed, buttons,
-                  name, leaders)
+    asked = time.perf_counter()
+    inputs = user_inputs(screen)
+    waited = time.perf_counter() - asked
+    buttons, name, moves_allowed = set_up_puzzle(tr, screen, assets, inputs)
+    board = Board(tr, screen, START_PUZZLE, moves_allowed, buttons,
+                  name, leaders, overlay, catalogue, assets)
     gameboard.make_leaderboard(tr, screen, leaders)
     
 
     # on click, execute board actions (swap, buttons)
     screen.onclick(board.update_board)
+    # undo, redo and hints from the keyboard
+    screen.onkey(board.undo, "u")
+    screen.onkey(board.redo, "r")
+    screen.onkey(board.show_hint, "h")
+    screen.listen()
+    report_time_to_interactive(waited)
     screen.mainloop()
 
 
@@ -0,0 +1,74 @@
+import atexit, json, logging, logging.handlers, queue
+
+LOGGER_NAME = 'logger'
+MAX_BYTES = 1000000 # rotate the log file at about 1 MB
+BACKUP_COUNT = 3
+# extra fields copied into each record, e.g.
+# logger.error("...", extra={"location": "board.add_puzzle()"})
+FIELDS = ("puzzle", "move", "location")
+
+# one background listener per log file, so configuring twice is a no-op
+_listeners = {}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+        JsonFormatter Class writes each log record as one JSON object
+        per line, with the puzzle, move and location fields when given.
+    """
+
+    def format(self, record):
+        """
+            Method format turns a record into a JSON line.
+            Parameters:
+                record (LogRecord): record to format
+        """
+        entry = {"time": self.formatTime(record),
+                 "name": record.name,
+                 "level": record.levelname,
+                 "message": record.getMessage()}
+        for field in FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry)
+
+
+def get_logger(file_name):
+    """
+        Function get_logger returns the game logger writing to file_name.
+        The first call for a file starts a listener thread that does the
+        file writes and rotation; the logger itself only puts records on
+        a queue, so logging never waits on the disk. Later calls return
+        the same logger without adding handlers.
+        Parameters:
+            file_name (str): log file to write to
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    if file_name not in _listeners:
+        records = queue.SimpleQueue()
+        handler = logging.handlers.RotatingFileHandler(
+            file_name, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT,
+            delay=True)
+        handler.setFormatter(JsonFormatter())
+        listener = logging.handlers.QueueListener(records, handler)
+        listener.start()
+        queue_handler = logging.handlers.QueueHandler(records)
+        logger.addHandler(queue_handler)
+        _listeners[file_name] = (listener, queue_handler)
+    return logger
+
+
+def shutdown():
+    """
+        Function shutdown writes out queued records and stops the
+        listener threads.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for listener, queue_handler in _listeners.values():
+        logger.removeHandler(queue_handler)
+        listener.stop()
+    _listeners.clear()
+
+
+atexit.register(shutdown)
@@ -1,9 +1,9 @@
-from Puzzle import Puzzle
+from process_puzzle import load_puzzle
 
-mario = Puzzle("mario.puz")
+mario = load_puzzle("mario.puz")
 
-print(mario.get_name())
+print(mario.name)
 print(mario.get_number())
-print(mario.get_size())
-print(mario.get_thumbnail())
-print(mario.get_tile(3))
+print(mario.size)
+print(mario.thumbnail)
+print(mario.tiles[2])
@@ -0,0 +1,207 @@
+import random
+from BoardState import BoardState
+
+# moves a difficulty walk may try before starting over from solved
+WALK_BUDGET = 2000
+# fresh walks tried before giving up on a difficulty
+WALK_ATTEMPTS = 100
+
+
+def permutation_parity(cells):
+    """
+        Function permutation_parity returns the parity of a permutation
+        by counting its cycles, in linear time.
+        Parameters:
+            cells (sequence): permutation of 0..n-1
+        Returns 0 for an even permutation, 1 for an odd one
+    """
+    seen = bytearray(len(cells))
+    transpositions = 0
+    for start in range(len(cells)):
+        if seen[start]:
+            continue
+        # a cycle of length k is made of k - 1 transpositions
+        length = 0
+        pos = start
+        while not seen[pos]:
+            seen[pos] = 1
+            pos = cells[pos]
+            length += 1
+        transpositions += length - 1
+    return transpositions & 1
+
+
+def is_solvable(cells, rows, cols):
+    """
+        Function is_solvable checks if a layout can be slid back into
+        the solved position. Every move is one transposition that also
+        moves the blank one step, so the permutation parity must match
+        the parity of the blank's distance from its home cell.
+        Parameters:
+            cells (sequence): 0-based tile at each position,
+                              blank is rows * cols - 1
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+        Returns True if the layout is solvable
+    """
+    blank_tile = rows * cols - 1
+    blank = list(cells).index(blank_tile)
+    blank_row, blank_col = divmod(blank, cols)
+    distance = (rows - 1 - blank_row) + (cols - 1 - blank_col)
+    return permutation_parity(cells) == distance & 1
+
+
+def get_random(seed):
+    """
+        Function get_random returns a random generator for the seed,
+        or the shared module generator if seed is None.
+    """
+    if seed is None:
+        return random
+    return random.Random(seed)
+
+
+def permutation_scramble(rows, cols, seed=None):
+    """
+        Function permutation_scramble shuffles the tiles uniformly and
+        fixes the parity by swapping two non-blank tiles if needed. A
+        shuffle that comes out solved is shuffled again.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+            seed (int): optional seed for a reproducible board
+        Returns solvable BoardState
+    """
+    rng = get_random(seed)
+    size = rows * cols
+    solved = list(range(size))
+    cells = list(solved)
+    while cells == solved:
+        rng.shuffle(cells)
+        if size > 2 and not is_solvable(cells, rows, cols):
+            # swapping any two tiles (never the blank) flips the parity
+            first, second = [pos for pos in range(3)
+                             if cells[pos] != size - 1][:2]
+            cells[first], cells[second] = cells[second], cells[first]
+    return BoardState(rows, cols, cells)
+
+
+def random_walk_scramble(rows, cols, depth, seed=None):
+    """
+        Function random_walk_scramble makes depth random moves from the
+        solved board, never undoing the previous move.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+            depth (int): number of moves to make
+            seed (int): optional seed for a reproducible board
+        Returns solvable BoardState
+    """
+    rng = get_random(seed)
+    state = BoardState(rows, cols)
+    previous = -1
+    for i in range(depth):
+        moves = [pos for pos in state.legal_moves() if pos != previous]
+        previous = state.apply_move(rng.choice(moves))
+    return state
+
+
+def difficulty_scramble(rows, cols, difficulty, seed=None):
+    """
+        Function difficulty_scramble builds a board whose optimal
+        solution is exactly difficulty moves long. Every move of the walk
+        raises the Manhattan distance by one, so after k moves the
+        distance is k; the walk itself is a k move solution and Manhattan
+        distance never overestimates, so k is optimal. When no move
+        raises the distance the walk backs up and tries another branch,
+        starting over from solved after WALK_BUDGET moves.
+        Boards small enough for a distance table are instead drawn from
+        all boards at exactly that distance.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+            difficulty (int): wanted optimal solution length
+            seed (int): optional seed for a reproducible board
+        Returns solvable BoardState. Raises ValueError if no board that
+        hard was found
+    """
+    rng = get_random(seed)
+    # imported on first use, the table is only needed for small boards
+    import distance_table
+    if distance_table.has_table(rows, cols):
+        return distance_table.get_table(rows, cols) \
+                             .random_state(difficulty, rng)
+    for attempt in range(WALK_ATTEMPTS):
+        state = harder_walk(rows, cols, difficulty, rng)
+        if state is not None:
+            return state
+    raise ValueError(f"no {rows}x{cols} board {difficulty} moves from "
+                     "solved was found")
+
+
+def harder_walk(rows, cols, difficulty, rng):
+    """
+        Function harder_walk searches depth first for a walk of
+        difficulty moves from the solved board where every move raises
+        the Manhattan distance, trying the moves in random order.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+            difficulty (int): length of the walk
+            rng (Random): orders the moves
+        Returns BoardState at the end of the walk, or None if
+        WALK_BUDGET moves did not find one
+    """
+    state = BoardState(rows, cols)
+    cells = state.cells
+
+    def harder_moves():
+        # a move only changes the distance of the tile that slides
+        blank_row, blank_col = divmod(state.blank, cols)
+        harder = []
+        for pos in state.legal_moves():
+            tile_row, tile_col = divmod(cells[pos], cols)
+            row, col = divmod(pos, cols)
+            before = abs(row - tile_row) + abs(col - tile_col)
+            after = abs(blank_row - tile_row) + abs(blank_col - tile_col)
+            if after > before:
+                harder.append(pos)
+        rng.shuffle(harder)
+        return harder
+
+    untried = [harder_moves()] # moves left to try at each depth
+    taken = [] # previous blank of each move made, to back up
+    for move in range(WALK_BUDGET):
+        if len(taken) == difficulty:
+            return state
+        while not untried[-1]:
+            # dead end, back up a move
+            untried.pop()
+            if not taken:
+                return None # every walk is shorter than difficulty
+            state.undo_move(taken.pop())
+        taken.append(state.apply_move(untried[-1].pop()))
+        untried.append(harder_moves())
+    return state if len(taken) == difficulty else None
+
+
+def scramble(rows, cols, mode="permutation", depth=None, seed=None):
+    """
+        Function scramble returns a solvable scrambled board.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+            mode (str): "permutation", "walk" or "difficulty"
+            depth (int): walk length or optimal solution length
+            seed (int): optional seed for a reproducible board
+        Returns solvable BoardState
+    """
+    if mode == "permutation":
+        return permutation_scramble(rows, cols, seed)
+    if depth is None:
+        raise ValueError(f"scramble mode {mode} needs a depth")
+    if mode == "walk":
+        return random_walk_scramble(rows, cols, depth, seed)
+    if mode == "difficulty":
+        return difficulty_scramble(rows, cols, depth, seed)
+    raise ValueError(f"unknown scramble mode {mode}")
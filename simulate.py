@@ -0,0 +1,126 @@
+import argparse, os, random, sys, tempfile, time
+import backends
+
+# puzzles are found beside this file, whatever the working directory
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_buttons():
+    """
+        Function make_buttons returns the quit, load and reset buttons
+        placed as in puzzle_game.set_up_puzzle.
+    """
+    from Tile import Tile
+    return [Tile("Resources/quitbutton.gif", 0, 80, 50, 260, -225,
+                 "none", 0, False, True),
+            Tile("Resources/loadbutton.gif", 0, 80, 80, 155, -210,
+                 "none", 0, False, True),
+            Tile("Resources/resetbutton.gif", 0, 80, 80, 55, -210,
+                 "none", 0, False, True)]
+
+
+def click_cell(board, pos):
+    """
+        Function click_cell clicks the middle of a board position.
+    """
+    from Board import BOARD_X, BOARD_Y
+    row, col = divmod(pos, board.state.cols)
+    board.update_board(BOARD_X + col * board.size + board.size / 2,
+                       BOARD_Y - row * board.size - board.size / 2)
+
+
+def play_game(puzzle, moves_allowed, win, rng, buttons, catalogue, overlay):
+    """
+        Function play_game plays one game through the Board click
+        handler: a winning game follows the hints, a losing one clicks
+        legal tiles at random until it runs out of moves.
+        Parameters:
+            puzzle (str): .puz file to load
+            moves_allowed (int): moves before the game is lost
+            win (bool): True to solve the puzzle
+            rng (Random): picks the random moves
+            buttons (list): quit, load and reset buttons
+            catalogue (Catalogue): shared puzzle catalogue
+            overlay (Overlay): shared message overlay
+        Returns True if the game was won
+    """
+    from Board import Board
+    screen = backends.make_screen()
+    board = Board(backends.make_turtle(), screen, puzzle, moves_allowed,
+                  buttons, "simulated", [], overlay, catalogue)
+    while not board.game_over:
+        pos = board.hint() if win else None
+        if pos is None:
+            pos = rng.choice(board.state.legal_moves())
+        click_cell(board, pos)
+    won = board.check_solved()
+    # hand the tile turtles back and drop the closing message
+    board.clear_puzzle()
+    overlay.cancel()
+    screen.run_timers()
+    return won
+
+
+def simulate(games, puzzle="yoshi.puz", moves_allowed=50, win_rate=0.5,
+             seed=None):
+    """
+        Function simulate plays games headless and times them.
+        Parameters:
+            games (int): number of games to play
+            puzzle (str): .puz file beside this module
+            moves_allowed (int): moves allowed per game
+            win_rate (float): fraction of games played to win
+            seed (int): optional seed for reproducible games
+        Returns dict of games, wins, losses and games per second
+    """
+    from catalogue import Catalogue
+    from Overlay import Overlay
+    if not isinstance(backends.get_backend(), backends.NullBackend):
+        backends.set_backend(backends.NullBackend())
+    rng = random.Random(seed)
+    catalogue = Catalogue(HERE)
+    overlay = Overlay(backends.make_screen())
+    buttons = make_buttons()
+    puzzle = os.path.join(HERE, puzzle)
+
+    wins = 0
+    start = time.perf_counter()
+    for game in range(games):
+        wins += play_game(puzzle, moves_allowed, rng.random() < win_rate,
+                          rng, buttons, catalogue, overlay)
+    elapsed = time.perf_counter() - start
+    catalogue.close()
+    return {"games": games, "wins": wins, "losses": games - wins,
+            "seconds": elapsed, "games_per_second": games / elapsed}
+
+
+def main():
+    """
+        Main function plays simulated games in a scratch directory, so
+        the real leaderboard and logs are not touched.
+    """
+    parser = argparse.ArgumentParser(
+        description="Play simulated games without a display.")
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("-p", "--puzzle", default="yoshi.puz")
+    parser.add_argument("-m", "--moves", type=int, default=50,
+                        help="moves allowed per game")
+    parser.add_argument("-w", "--win-rate", type=float, default=0.5)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            result = simulate(args.games, args.puzzle, args.moves,
+                              args.win_rate, args.seed)
+        finally:
+            os.chdir(cwd)
+    print(f"{result['games']} games ({result['wins']} won, "
+          f"{result['losses']} lost) in {result['seconds']:.2f}s: "
+          f"{result['games_per_second']:.0f} games/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import time
+from scramble import is_solvable
+
+# returned by the search when the goal is reached
+FOUND = -1
+
+
+class LinearConflict:
+    """
+        LinearConflict Class is the Manhattan distance plus linear conflict
+        heuristic. It keeps the distance and the conflict count of every
+        row and column, so a move only re-scores the lines it touches.
+    """
+
+    def __init__(self, rows, cols):
+        """
+            Method __init__ builds the distance tables for a board size.
+            Parameters:
+                rows (int): number of rows on the board
+                cols (int): number of columns on the board
+        """
+        self.rows = rows
+        self.cols = cols
+        size = rows * cols
+        self.blank_tile = size - 1
+
+        # distance[tile][pos] = moves for tile to get home from pos
+        self.distance = []
+        for tile in range(size):
+            home_row, home_col = divmod(tile, cols)
+            self.distance.append([
+                0 if tile == self.blank_tile else
+                abs(pos // cols - home_row) + abs(pos % cols - home_col)
+                for pos in range(size)])
+        self.row_of = [pos // cols for pos in range(size)]
+        self.col_of = [pos % cols for pos in range(size)]
+        # conflict scores seen so far, one cache per line
+        self.row_cache = [{} for row in range(rows)]
+        self.col_cache = [{} for col in range(cols)]
+
+
+    def line_conflict(self, goals):
+        """
+            Method line_conflict returns the extra moves needed by tiles
+            sharing their goal line: two for every tile that must leave
+            the line so the rest are in order.
+            Parameters:
+                goals (list): goal index along the line of each tile in
+                              its goal line, in board order
+        """
+        # longest increasing run that can stay put
+        best = []
+        for i in range(len(goals)):
+            length = 1
+            for j in range(i):
+                if goals[j] < goals[i] and best[j] + 1 > length:
+                    length = best[j] + 1
+            best.append(length)
+        return 2 * (len(goals) - max(best, default=0))
+
+
+    def row_score(self, cells, row):
+        """
+            Method row_score returns the conflict cost of one row.
+        """
+        cols = self.cols
+        line = cells[row * cols:(row + 1) * cols].tobytes()
+        score = self.row_cache[row].get(line)
+        if score is None:
+            goals = [tile % cols for tile in line
+                     if tile // cols == row and tile != self.blank_tile]
+            score = self.line_conflict(goals)
+            self.row_cache[row][line] = score
+        return score
+
+
+    def col_score(self, cells, col):
+        """
+            Method col_score returns the conflict cost of one column.
+        """
+        cols = self.cols
+        line = cells[col::cols].tobytes()
+        score = self.col_cache[col].get(line)
+        if score is None:
+            goals = [tile // cols for tile in line
+                     if tile % cols == col and tile != self.blank_tile]
+            score = self.line_conflict(goals)
+            self.col_cache[col][line] = score
+        return score
+
+
+    def reset(self, cells):
+        """
+            Method reset scores a whole board from scratch.
+            Parameters:
+                cells (array): 0-based tile at each position
+            Returns the heuristic value
+        """
+        manhattan = 0
+        for pos in range(len(cells)):
+            manhattan += self.distance[cells[pos]][pos]
+        self.row_scores = [self.row_score(cells, row)
+                           for row in range(self.rows)]
+        self.col_scores = [self.col_score(cells, col)
+                           for col in range(self.cols)]
+        self.value = manhattan + sum(self.row_scores) + \
+                     sum(self.col_scores)
+        return self.value
+
+
+    def moved(self, cells, tile, src, dst):
+        """
+            Method moved updates the score after tile slid from src to dst.
+            cells must already hold the new layout. Sliding into the blank
+            never changes the order of counted tiles within a line, so
+            only a line the tile enters or leaves as its home line can
+            change its conflicts.
+            Returns the heuristic value
+        """
+        distance = self.distance[tile]
+        value = self.value + distance[dst] - distance[src]
+
+        if self.col_of[src] == self.col_of[dst]:
+            # vertical move: rescore the home row if entered or left
+            home_row = self.row_of[tile]
+            if home_row == self.row_of[src] or home_row == self.row_of[dst]:
+                score = self.row_score(cells, home_row)
+                value += score - self.row_scores[home_row]
+                self.row_scores[home_row] = score
+        else:
+            # horizontal move: rescore the home column if entered or left
+            home_col = self.col_of[tile]
+            if home_col == self.col_of[src] or home_col == self.col_of[dst]:
+                score = self.col_score(cells, home_col)
+                value += score - self.col_scores[home_col]
+                self.col_scores[home_col] = score
+        self.value = value
+        return value
+
+
+class Solution:
+    """
+        Solution Class holds the result of a solve: the moves as board
+        positions of the tile to slide (the input of
+        BoardState.apply_move) and the search statistics.
+    """
+
+    def __init__(self, moves, tiles, nodes, iterations, elapsed):
+        """
+            Method __init__ initializes a new solution.
+            Parameters:
+                moves (list): board position of each tile to slide
+                tiles (list): 1-based number of each tile slid
+                nodes (int): number of states expanded
+                iterations (int): number of IDA* deepening passes
+                elapsed (float): seconds spent searching
+        """
+        self.moves = moves
+        self.tiles = tiles
+        self.nodes = nodes
+        self.iterations = iterations
+        self.elapsed = elapsed
+
+
+    def __len__(self):
+        return len(self.moves)
+
+
+    def __repr__(self):
+        return (f"Solution(length={len(self.moves)}, nodes={self.nodes}, "
+                f"iterations={self.iterations}, "
+                f"elapsed={self.elapsed:.3f}s)")
+
+
+def solve(state, heuristic=None, time_limit=None, stop=None):
+    """
+        Function solve finds an optimal solution with IDA*.
+        Parameters:
+            state (BoardState): board to solve, left unchanged
+            heuristic: admissible heuristic with reset and moved methods,
+                       LinearConflict if None
+            time_limit (float): seconds before giving up, no limit if None
+            stop (Event): the search gives up once it is set, so another
+                          thread can end it early
+        Returns Solution, raises TimeoutError if time_limit runs out or
+        stop is set
+    """
+    start = time.perf_counter()
+    if not is_solvable(state.cells, state.rows, state.cols):
+        raise ValueError("board is not solvable")
+    if heuristic is None:
+        heuristic = LinearConflict(state.rows, state.cols)
+    work = state.copy()
+    cells = work.cells
+    neighbours = work.neighbours
+    blank_tile = work.blank_tile
+    moved = heuristic.moved
+    path = []
+    nodes = 0
+    deadline = None if time_limit is None else start + time_limit
+
+    def search(blank, g, bound, previous, h):
+        nonlocal nodes
+        nodes += 1
+        if h == 0:
+            return FOUND
+        if not nodes & 0xffff:
+            if deadline is not None and time.perf_counter() > deadline:
+                raise TimeoutError(f"no solution within {time_limit}s")
+            if stop is not None and stop.is_set():
+                raise TimeoutError("search stopped")
+        lowest = None
+        for pos in neighbours[blank]:
+            if pos == previous: # never undo the last move
+                continue
+            tile = cells[pos]
+            cells[blank] = tile
+            cells[pos] = blank_tile
+            child_h = moved(cells, tile, pos, blank)
+            f = g + 1 + child_h
+            if f <= bound:
+                path.append(pos)
+                f = search(pos, g + 1, bound, blank, child_h)
+                if f == FOUND:
+                    return FOUND
+                path.pop()
+            # undo the move
+            cells[pos] = tile
+            cells[blank] = blank_tile
+            moved(cells, tile, blank, pos)
+            if lowest is None or f < lowest:
+                lowest = f
+        return lowest
+
+    h = heuristic.reset(cells)
+    bound = h
+    iterations = 0
+    while True:
+        iterations += 1
+        result = search(work.blank, 0, bound, -1, h)
+        if result == FOUND:
+            break
+        bound = result
+
+    # replay the path to report which tiles were slid
+    replay = state.copy()
+    tiles = []
+    for pos in path:
+        tiles.append(replay.tile_at(pos) + 1)
+        replay.apply_move(pos)
+    return Solution(path, tiles, nodes, iterations,
+                    time.perf_counter() - start)
+
+
+def optimal_length(state, heuristic=None, time_limit=None):
+    """
+        Function optimal_length returns the number of moves in an optimal
+        solution of state, looked up without a search on small boards.
+        Raises ValueError if the board cannot be solved
+    """
+    import distance_table
+    if distance_table.has_table(state.rows, state.cols):
+        length = distance_table.get_table(state.rows, state.cols) \
+                               .distance(state.cells)
+        if length is None:
+            raise ValueError("board is not solvable")
+        return length
+    return len(solve(state, heuristic, time_limit))
+
+
+def is_achievable(state, moves, heuristic=None, time_limit=None):
+    """
+        Function is_achievable checks if the board can be solved in
+        exactly moves moves. Any optimal solution can be padded by
+        sliding a tile back and forth, so every longer count with the
+        same parity is achievable too.
+        Parameters:
+            state (BoardState): board at the start of the game
+            moves (int): claimed number of moves
+        Returns True if moves is achievable
+    """
+    best = optimal_length(state, heuristic, time_limit)
+    return moves >= best and (moves - best) % 2 == 0
@@ -0,0 +1,11 @@
+import os, sys
+
+# the game modules sit at the top of the repository, not in a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backends
+
+# every test runs without a display or Tk
+backends.set_backend(backends.NullBackend())
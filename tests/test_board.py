@@ -0,0 +1,63 @@
+import os
+import pytest
+import backends, simulate
+from Board import Board
+from simulate import HERE, make_buttons, click_cell
+
+
+@pytest.fixture
+def scratch(tmp_path, monkeypatch):
+    """
+        Fixture scratch runs a test in an empty directory, so the
+        leaderboard and logs it writes are thrown away.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def make_board(puzzle, moves_allowed=100):
+    """
+        Function make_board loads a puzzle beside the game modules.
+    """
+    return Board(backends.make_turtle(), backends.make_screen(),
+                 os.path.join(HERE, puzzle), moves_allowed, make_buttons(),
+                 "tester", [])
+
+
+def test_simulated_games(scratch):
+    result = simulate.simulate(20, seed=3)
+    assert result["games"] == 20
+    assert result["wins"] + result["losses"] == 20
+    assert result["wins"] > 0
+    assert os.path.exists("leaders.txt") or os.path.exists("leaders.txt.log")
+
+
+def test_moves_undo_redo_and_history(scratch):
+    board = make_board("fifteen.puz")
+    start = board.state.copy()
+    for i in range(6):
+        click_cell(board, board.state.legal_moves()[i % 2])
+    assert board.moves == 6
+    after = board.state.copy()
+    assert board.undo() and board.undo()
+    assert board.redo() and board.redo()
+    assert board.state == after
+    first, text = board.get_history()
+    assert first == start
+    assert text == board.history.to_string()
+
+
+def test_rejected_first_puzzle(scratch):
+    board = make_board("malformed_mario.puz")
+    assert not board.has_puzzle()
+    # nothing to click, undo or hint until a puzzle is loaded
+    board.update_board(0, 0)
+    board.reset_button()
+    board.show_hint()
+    assert not board.undo() and not board.redo()
+    assert board.hint() is None
+    board.screen.answers.append(os.path.join(HERE, "luigi.puz"))
+    board.load_button()
+    assert board.has_puzzle()
+    click_cell(board, board.state.legal_moves()[0])
+    assert board.moves == 1
@@ -0,0 +1,68 @@
+import random
+from BoardState import BoardState
+from zobrist import zobrist_hash, pack, unpack
+
+
+def random_moves(state, count, seed):
+    """
+        Function random_moves makes count random legal moves.
+        Returns list of the blank positions that undo them, last first
+    """
+    rng = random.Random(seed)
+    undo = []
+    for i in range(count):
+        undo.append(state.apply_move(rng.choice(state.legal_moves())))
+    undo.reverse()
+    return undo
+
+
+def check_cached(state):
+    """
+        Function check_cached compares the incrementally kept values
+        with values recomputed from the cells.
+    """
+    fresh = BoardState(state.rows, state.cols, state.cells)
+    assert state.blank == fresh.blank
+    assert state.misplaced == fresh.misplaced
+    assert state.get_zobrist() == fresh.get_zobrist()
+    assert state.get_zobrist() == zobrist_hash(state.cells, state.rows,
+                                               state.cols)
+    if state.size <= 16:
+        assert state.packed_key() == fresh.packed_key() == pack(state.cells)
+        assert unpack(state.packed_key(), state.size) == list(state.cells)
+
+
+def test_incremental_values_match_recomputed():
+    for rows, cols in [(2, 2), (3, 3), (4, 4), (3, 5), (5, 3), (6, 6)]:
+        state = BoardState(rows, cols)
+        for seed in range(5):
+            random_moves(state, 50, seed)
+            check_cached(state)
+
+
+def test_undo_restores_the_board():
+    state = BoardState(4, 4)
+    random_moves(state, 30, 1)
+    before = state.copy()
+    for blank in random_moves(state, 40, 2):
+        state.undo_move(blank)
+    assert state == before
+    check_cached(state)
+
+
+def test_solved_only_at_home():
+    state = BoardState(3, 3)
+    assert state.is_solved()
+    pos = state.legal_moves()[0]
+    state.apply_move(pos)
+    assert not state.is_solved()
+    state.reset()
+    assert state.is_solved()
+    check_cached(state)
+
+
+def test_transposed_shapes_hash_differently():
+    numbers = list(range(1, 21))
+    wide = BoardState.from_tile_numbers(numbers, 4, 5)
+    tall = BoardState.from_tile_numbers(numbers, 5, 4)
+    assert wide.get_zobrist() != tall.get_zobrist()
@@ -0,0 +1,65 @@
+import os, threading
+from leaderboard import LeaderboardStore, SqliteLeaderboard
+
+
+def test_entries_sorted_best_first(tmp_path):
+    store = LeaderboardStore(str(tmp_path / "leaders.txt"), compact_every=4)
+    for moves, name in [(30, "c"), (10, "a"), (20, "b"), (10, "d"),
+                        (5, "e"), (40, "f")]:
+        store.add(moves, name)
+    assert store.top(3) == [(5, "e"), (10, "a"), (10, "d")]
+    assert len(list(store.entries())) == 6
+
+
+def test_two_stores_share_the_file(tmp_path):
+    file_name = str(tmp_path / "leaders.txt")
+    first = LeaderboardStore(file_name, compact_every=3)
+    second = LeaderboardStore(file_name, compact_every=3)
+    first.add(5, "alice")
+    # the second store compacts, the first store's entry must survive
+    for i in range(3):
+        second.add(10 + i, f"b{i}")
+    assert first.top()[0] == second.top()[0] == (5, "alice")
+    assert len(first.top()) == len(second.top()) == 4
+    first.add(1, "x")
+    first.add(2, "y")
+    assert len(second.top()) == 6
+    assert len(list(first.entries())) == 6
+
+
+def test_interrupted_compaction_is_recovered(tmp_path):
+    file_name = str(tmp_path / "leaders.txt")
+    store = LeaderboardStore(file_name, compact_every=3)
+    store.add(3, "z")
+    # a compaction that stopped after moving the log aside
+    os.rename(file_name + ".log", file_name + ".merging")
+    reopened = LeaderboardStore(file_name, compact_every=3)
+    assert reopened.top() == [(3, "z")]
+    for i in range(3):
+        reopened.add(50 + i, f"q{i}")
+    assert len(reopened.top()) == 4
+    assert not os.path.exists(file_name + ".merging")
+
+
+def test_sqlite_migrates_once(tmp_path):
+    text_file = str(tmp_path / "leaders.txt")
+    with open(text_file, "w") as outfile:
+        outfile.writelines(f"{i}:p{i}\n" for i in range(50))
+    db_file = str(tmp_path / "leaders.db")
+    results = []
+
+    def open_and_migrate():
+        database = SqliteLeaderboard(db_file)
+        results.append(database.migrate(text_file))
+        database.close()
+
+    threads = [threading.Thread(target=open_and_migrate) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == [False, False, False, True]
+    database = SqliteLeaderboard(db_file)
+    assert len(list(database.entries())) == 50
+    assert database.migrate(text_file) is False
+    database.close()
@@ -0,0 +1,69 @@
+import random
+import distance_table
+from BoardState import BoardState
+from move_log import MoveLog, direction_of, OPPOSITE, DOWN, RIGHT, replay
+from scramble import random_walk_scramble
+
+
+def play(state, count, seed):
+    """
+        Function play makes count random moves and logs them.
+        Returns the MoveLog
+    """
+    rng = random.Random(seed)
+    history = MoveLog()
+    for i in range(count):
+        pos = rng.choice(state.legal_moves())
+        history.append(direction_of(state.blank, pos, state.cols))
+        state.apply_move(pos)
+    return history
+
+
+def test_string_round_trip():
+    for count in range(0, 13):
+        history = play(BoardState(4, 4), count, count)
+        text = history.to_string()
+        copy = MoveLog.from_string(text)
+        assert len(copy) == count
+        assert copy.directions() == history.directions()
+        assert copy.to_string() == text
+
+
+def test_undo_redo_and_new_move():
+    history = play(BoardState(3, 3), 6, 2)
+    moves = history.directions()
+    assert history.undo() == moves[-1]
+    assert history.undo() == moves[-2]
+    assert history.redo() == moves[-2]
+    assert history.directions() == moves[:-1]
+    # a new move drops the undone one
+    history.append(OPPOSITE[moves[-2]])
+    assert history.redo() is None
+    assert history.directions() == moves[:-1] + [OPPOSITE[moves[-2]]]
+
+
+def test_replay_accepts_a_solving_game():
+    state = random_walk_scramble(3, 3, 20, seed=4)
+    start = state.copy()
+    history = MoveLog()
+    while not state.is_solved():
+        pos = distance_table.get_table(3, 3).next_move(state)
+        history.append(direction_of(state.blank, pos, state.cols))
+        state.apply_move(pos)
+    text = history.to_string()
+    assert replay(start, text)
+    assert replay(start, text, moves_allowed=len(history))
+    assert not replay(start, text, moves_allowed=len(history) - 1)
+
+
+def test_replay_rejects_bad_games():
+    start = random_walk_scramble(3, 3, 20, seed=5)
+    history = play(start.copy(), 4, 5)
+    assert not replay(start, history.to_string()) # not solved
+    assert not replay(start, "3.") # too few bytes
+    assert not replay(start, "moves")
+    # the blank of a solved board is in the bottom right corner
+    for direction in (DOWN, RIGHT):
+        off = MoveLog()
+        off.append(direction)
+        assert not replay(BoardState(3, 3), off.to_string())
@@ -0,0 +1,69 @@
+import pytest
+from PuzzleSpec import (PuzzleSpec, PuzzleFormatError, HEADER, MAGIC,
+                        VERSION)
+
+
+def puzzle_text(number=9, size=98, tiles=None, extra=""):
+    """
+        Function puzzle_text returns the text of a .puz file.
+    """
+    if tiles is None:
+        tiles = [f"t{n}.gif" for n in range(1, number)] + ["blank.gif"]
+    lines = ["name: test", f"number: {number}", f"size: {size}",
+             "thumbnail: thumb.gif"]
+    lines += [f"{n}: {image}" for n, image in enumerate(tiles, 1)]
+    return "\n".join(lines) + "\n" + extra
+
+
+def test_parse_square_and_rectangular():
+    spec = PuzzleSpec.parse(puzzle_text())
+    assert (spec.rows, spec.cols, spec.size) == (3, 3, 98)
+    assert spec.tiles[-1] == "blank.gif"
+    spec = PuzzleSpec.parse(puzzle_text(number=12, size=80, extra="rows: 3"))
+    assert (spec.rows, spec.cols) == (3, 4)
+
+
+@pytest.mark.parametrize("text, message", [
+    (puzzle_text(number=10), "do not fill"),
+    (puzzle_text(number=121, size=4, extra="rows: 11"), "outside"),
+    (puzzle_text(size=0), "positive"),
+    (puzzle_text(size=200), "do not fit"),
+    (puzzle_text(tiles=[f"t{n}.gif" for n in range(1, 10)]), "blank"),
+    (puzzle_text(tiles=["blank.gif"] * 8), "missing [9]"),
+    (puzzle_text(extra="colour: red"), "unknown key"),
+    (puzzle_text(extra="3: again.gif"), "listed twice"),
+    ("name: test\n", "missing 'number'"),
+])
+def test_parse_rejects(text, message):
+    with pytest.raises(PuzzleFormatError) as error:
+        PuzzleSpec.parse(text, "bad.puz")
+    assert message in str(error.value)
+    assert str(error.value).startswith("bad.puz")
+
+
+def test_compiled_round_trip():
+    spec = PuzzleSpec.parse(puzzle_text(number=12, size=80, extra="cols: 4"))
+    copy = PuzzleSpec.from_bytes(spec.to_bytes())
+    assert (copy.name, copy.rows, copy.cols, copy.size, copy.thumbnail,
+            copy.tiles, copy.image) == \
+           (spec.name, spec.rows, spec.cols, spec.size, spec.thumbnail,
+            spec.tiles, spec.image)
+
+
+def test_compiled_validation():
+    good = PuzzleSpec.parse(puzzle_text()).to_bytes()
+    no_blank = PuzzleSpec("x", 3, 3, 98, "t.gif",
+                          [f"t{n}.gif" for n in range(9)]).to_bytes()
+    for data, message in [
+            (good + b"x", "trailing"),
+            (good[:-3], "truncated"),
+            (b"PU", "corrupt"),
+            (b"NOPE" + good[4:], "not a compiled puzzle"),
+            (HEADER.pack(MAGIC, VERSION, 0, 0, 10), "outside"),
+            (HEADER.pack(MAGIC, VERSION, 11, 11, 10), "outside"),
+            (HEADER.pack(MAGIC, VERSION, 3, 3, 0), "positive"),
+            (HEADER.pack(MAGIC, VERSION, 3, 3, 200), "do not fit"),
+            (no_blank, "blank")]:
+        with pytest.raises(PuzzleFormatError) as error:
+            PuzzleSpec.from_bytes(data, "bad.puzc")
+        assert message in str(error.value)
@@ -0,0 +1,53 @@
+import itertools
+import pytest
+import distance_table, scramble, solver
+
+
+def test_is_solvable_matches_distance_table():
+    table = distance_table.get_table(2, 3)
+    for cells in itertools.permutations(range(6)):
+        reachable = table.distance(cells) is not None
+        assert scramble.is_solvable(cells, 2, 3) == reachable
+
+
+def test_permutation_parity_counts_swaps():
+    assert scramble.permutation_parity([0, 1, 2, 3]) == 0
+    assert scramble.permutation_parity([1, 0, 2, 3]) == 1
+    assert scramble.permutation_parity([1, 2, 0, 3]) == 0
+    assert scramble.permutation_parity([3, 2, 1, 0]) == 0
+
+
+def test_permutation_scramble_is_solvable():
+    for rows, cols in [(2, 2), (3, 3), (4, 4), (3, 5), (10, 10)]:
+        for seed in range(20):
+            state = scramble.permutation_scramble(rows, cols, seed)
+            assert scramble.is_solvable(state.cells, rows, cols)
+            assert not state.is_solved()
+            assert sorted(state.cells) == list(range(rows * cols))
+
+
+def test_permutation_scramble_is_reproducible():
+    first = scramble.permutation_scramble(4, 4, seed=7)
+    second = scramble.permutation_scramble(4, 4, seed=7)
+    assert first == second
+
+
+def test_random_walk_scramble_is_solvable():
+    for seed in range(20):
+        state = scramble.random_walk_scramble(4, 5, 60, seed)
+        assert scramble.is_solvable(state.cells, 4, 5)
+
+
+def test_difficulty_scramble_is_exact():
+    table = distance_table.get_table(3, 3)
+    for difficulty in (1, 12, 31):
+        state = scramble.difficulty_scramble(3, 3, difficulty, seed=1)
+        assert table.distance(state.cells) == difficulty
+    # larger boards use a walk that only moves tiles away from home
+    state = scramble.difficulty_scramble(4, 4, 14, seed=2)
+    assert solver.optimal_length(state) == 14
+
+
+def test_difficulty_scramble_too_hard():
+    with pytest.raises(ValueError):
+        scramble.difficulty_scramble(3, 3, 32, seed=1)
@@ -0,0 +1,82 @@
+import random
+import pytest
+import distance_table, pattern_db, solver
+from BoardState import BoardState
+from scramble import random_walk_scramble
+
+
+def board_at(table, depth, seed):
+    """
+        Function board_at returns a 3x3 board depth moves from solved.
+    """
+    return table.random_state(depth, random.Random(seed))
+
+
+def check_solution(state, solution):
+    """
+        Function check_solution plays a solution and checks that it
+        solves the board without changing the board passed in.
+    """
+    work = state.copy()
+    for pos in solution.moves:
+        assert work.move(pos)
+    assert work.is_solved()
+
+
+def test_solution_length_matches_distance_table():
+    table = distance_table.get_table(3, 3)
+    for depth in (0, 1, 8, 17, 24, 31):
+        state = board_at(table, depth, depth)
+        solution = solver.solve(state)
+        assert len(solution) == depth == table.distance(state.cells)
+        check_solution(state, solution)
+
+
+def test_linear_conflict_is_admissible():
+    table = distance_table.get_table(3, 3)
+    heuristic = solver.LinearConflict(3, 3)
+    for seed in range(200):
+        state = board_at(table, seed % 32, seed)
+        assert heuristic.reset(state.cells) <= table.distance(state.cells)
+
+
+def test_unsolvable_board_is_rejected():
+    state = BoardState(3, 3)
+    state.cells[0], state.cells[1] = state.cells[1], state.cells[0]
+    with pytest.raises(ValueError):
+        solver.solve(state)
+
+
+def test_rank_round_trip():
+    cells = 12
+    for k in (1, 3, 5):
+        seen = set()
+        for index in range(pattern_db.pattern_size(cells, k)):
+            positions = pattern_db.unrank(index, k, cells)
+            assert len(set(positions)) == k
+            assert pattern_db.rank(positions, cells) == index
+            seen.add(tuple(positions))
+        assert len(seen) == pattern_db.pattern_size(cells, k)
+
+
+def test_pattern_database_is_admissible(tmp_path):
+    file_name = str(tmp_path / "patterns_3x3.pdb")
+    pattern_db.build(3, 3, pattern_db.partition(3, 3, [4, 4]), file_name)
+    database = pattern_db.PatternDatabase(file_name)
+    table = distance_table.get_table(3, 3)
+    try:
+        for seed in range(300):
+            state = board_at(table, seed % 32, seed)
+            value = database.reset(state.cells)
+            assert value <= table.distance(state.cells)
+            # the value kept while moving matches a fresh lookup
+            pos = state.legal_moves()[0]
+            tile, blank = state.cells[pos], state.blank
+            state.apply_move(pos)
+            moved = database.moved(state.cells, tile, pos, blank)
+            assert moved == database.reset(state.cells)
+        state = random_walk_scramble(3, 3, 40, seed=1)
+        solution = solver.solve(state, database)
+        assert len(solution) == table.distance(state.cells)
+    finally:
+        database.close()
@@ -0,0 +1,73 @@
+import random
+
+# fixed seed, so a board hashes the same in every process and session
+ZOBRIST_SEED = 5001
+# random keys by board shape: table[pos][tile]
+_TABLES = {}
+
+
+def zobrist_table(rows, cols):
+    """
+        Function zobrist_table returns the random 64-bit key of every
+        tile in every cell of a board. The keys are drawn for the shape,
+        not the cell count, so a 4x5 and a 5x4 board with the same cells
+        hash differently.
+        Parameters:
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+    """
+    table = _TABLES.get((rows, cols))
+    if table is None:
+        size = rows * cols
+        rng = random.Random(f"{ZOBRIST_SEED}:{rows}x{cols}")
+        table = tuple(tuple(rng.getrandbits(64) for tile in range(size))
+                      for pos in range(size))
+        _TABLES[(rows, cols)] = table
+    return table
+
+
+def zobrist_hash(cells, rows, cols):
+    """
+        Function zobrist_hash returns the Zobrist hash of a layout, the
+        XOR of the key of each tile in its cell.
+        Parameters:
+            cells (sequence): 0-based tile in each cell
+            rows (int): number of rows on the board
+            cols (int): number of columns on the board
+    """
+    table = zobrist_table(rows, cols)
+    value = 0
+    for pos in range(len(cells)):
+        value ^= table[pos][cells[pos]]
+    return value
+
+
+# largest board whose packed key fits in 64 bits, 4 bits per cell
+PACKED_MAX_SIZE = 16
+
+
+def pack(cells):
+    """
+        Function pack encodes a layout of up to 16 cells as one integer
+        below 2**64, four bits per cell with cell 0 in the low bits.
+        Parameters:
+            cells (sequence): 0-based tile in each cell
+        Raises ValueError for boards with more than 16 cells
+    """
+    if len(cells) > PACKED_MAX_SIZE:
+        raise ValueError(f"{len(cells)} cells do not pack into 64 bits")
+    value = 0
+    for pos in range(len(cells) - 1, -1, -1):
+        value = (value << 4) | cells[pos]
+    return value
+
+
+def unpack(value, size):
+    """
+        Function unpack decodes a layout written by pack.
+        Parameters:
+            value (int): packed layout
+            size (int): number of cells
+        Returns list of the 0-based tile in each cell
+    """
+    return [(value >> (4 * pos)) & 15 for pos in range(size)]